@@ -0,0 +1,118 @@
+"""
+Pre-fork multi-worker serving: the model is loaded once in the parent and
+shared copy-on-write with every worker, instead of `uvicorn --workers N`
+re-importing and re-loading it N times.
+
+    python3 api/serve.py --workers 4 [--threads 1] [--compiled] [--host 0.0.0.0] [--port 8000]
+
+Workers are forked uvicorn servers accepting on the parent's listening
+socket. Classifier threads are pinned to --threads per worker (default
+cores // workers) so N workers never oversubscribe the cores. --compiled
+(or SECUREINFER_COMPILED=1) serves with the NumPy CompiledForest and the fast
+path instead of the XGBoost booster, as api/server.py does. The parent
+respawns a worker that dies. A hot reload (src/model_registry.py) happens
+per worker, each then holding a private copy of the new version, pinned to
+the same --threads.
+Briefing results and the /briefing, /explainer/cache and /classifier/cache
+stats go through a SharedStore (SQLite in a temp dir), so a briefing_id
+can be polled on any worker and stats cover all of them.
+"""
+import argparse, os, sys
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="SecureInfer pre-fork API server")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--threads", type=int, default=0, help="classifier threads per worker (0 = cores // workers)")
+    ap.add_argument("--compiled", action="store_true", help="NumPy CompiledForest + fast path instead of the booster")
+    ap.add_argument("--host",    default="127.0.0.1")
+    ap.add_argument("--port",    type=int, default=8000)
+    ap.add_argument("--log-level", default="warning")
+    return ap.parse_args()
+
+def main():
+    args    = parse_args()
+    threads = args.threads or max(1, (os.cpu_count() or 1) // args.workers)
+    # Before numpy/xgboost load → their OpenMP/BLAS pools start at this size
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads)
+
+    import gc, shutil, signal, socket, tempfile, threading, time
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import uvicorn
+    import api.server as server
+    from src.pipeline import ModelSet, SEVERITY_MAP
+    from src.metrics  import Metrics
+    from src.shared_store import SharedStore
+    from src import model_registry
+
+    server.COMPILED    = server.COMPILED or args.compiled
+    version, model_dir = model_registry.resolve()
+    server.THREADS     = threads
+    server.PRELOADED   = ModelSet(model_dir, version, compiled=server.COMPILED).validate().set_threads(threads)
+    server.PRELOADED.bulk_booster(wait=True)    # batch booster too → shared, not one per worker
+    # One counter row per worker in shared memory → any worker's /metrics covers them all
+    server.METRICS     = Metrics(classes=SEVERITY_MAP, slots=args.workers, shared=True)
+    shared_dir         = tempfile.mkdtemp(prefix="secureinfer-")
+    server.SHARED      = SharedStore(os.path.join(shared_dir, "shared.db"))
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    # Parent heap → permanent GC generation: collections in the workers
+    # no longer touch (and so copy) the shared model pages
+    gc.freeze()
+
+    parent = os.getpid()
+    def orphan_check():
+        # Parent gone (killed, crashed) → shut this worker down instead of serving on alone
+        while os.getppid() == parent:
+            time.sleep(1.0)
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    children = {}
+    def spawn(slot: int):
+        pid = os.fork()
+        if pid == 0:
+            server.METRICS.slot = server.SHARED.worker = slot
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT,  signal.SIG_DFL)
+            threading.Thread(target=orphan_check, daemon=True).start()
+            config = uvicorn.Config(server.app, log_level=args.log_level, access_log=False)
+            uvicorn.Server(config).run(sockets=[sock])
+            os._exit(0)
+        children[pid] = slot
+
+    stopping = False
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    for slot in range(args.workers):
+        spawn(slot)
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT,  stop)
+    print(f"🚀 SecureInfer on http://{args.host}:{args.port} — {args.workers} worker(s) × "
+          f"{threads} thread(s), model {version} shared copy-on-write")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        slot = children.pop(pid, None)
+        if slot is not None and not stopping:
+            print(f"⚠️  Worker {slot} (pid {pid}) exited with status {status} — respawning")
+            spawn(slot)
+    sock.close()
+    shutil.rmtree(shared_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
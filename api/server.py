@@ -1,9 +1,14 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse, Response
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Optional
-import sys, os
+from typing import List, Optional
+import sys, os, time, json, asyncio, threading
+import numpy as np
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from src.pipeline import SecureInferPipeline
+from src.pipeline import SecureInferPipeline, SEVERITY_MAP
+from src.model_registry import ModelWatcher
+from src import frames
 
 app = FastAPI(
     title="SecureInfer API",
@@ -11,11 +16,62 @@ app = FastAPI(
     version="1.0.0"
 )
 _pipeline = None
+_watcher  = None
+RELOAD_POLL_S = 5.0     # how often models/registry/CURRENT is checked
+PRELOADED     = None    # ModelSet loaded once by api/serve.py before forking workers
+THREADS       = None    # api/serve.py: classifier threads per worker, kept across reloads
+METRICS       = None    # api/serve.py: Metrics in shared memory, one row per worker
+SHARED        = None    # api/serve.py: SharedStore — briefings + stats visible to every worker
+STATS_PUBLISH_S = 2.0   # how often a worker refreshes its stats snapshot in SHARED
+# Opt-in (SECUREINFER_COMPILED=1 or api/serve.py --compiled): NumPy CompiledForest + fast path
+# instead of the XGBoost booster; with a model.npz bundle xgboost is then never imported
+COMPILED      = os.environ.get("SECUREINFER_COMPILED", "0") == "1"
+
+STREAM_BATCH_ROWS  = 256    # most rows one /ws/flows classifier call takes
+STREAM_WINDOW_MS   = 2.0    # an idle stream waits this long for a lone row to gain company
+STREAM_MAX_PENDING = 4096   # rows buffered per connection before the server stops reading
 
 @app.on_event("startup")
 async def startup():
-    global _pipeline
-    _pipeline = SecureInferPipeline()
+    global _pipeline, _watcher
+    _pipeline = SecureInferPipeline(async_briefings=True, compiled=COMPILED, low_latency=COMPILED,
+                                    models=PRELOADED, metrics=METRICS, briefing_store=SHARED,
+                                    threads=THREADS)
+    _watcher  = ModelWatcher(_pipeline, poll_s=RELOAD_POLL_S)
+    if SHARED is not None:
+        threading.Thread(target=_publish_stats, name="stats-publish", daemon=True).start()
+    _pipeline.models.bulk_booster()     # background load; api/serve.py did it before fork
+
+def _local_stats() -> dict:
+    stats = {"briefing":         _pipeline.briefings.stats() if _pipeline.briefings else None,
+             "explainer_cache":  _pipeline.explainer.cache.stats(),
+             "classifier_cache": _pipeline.cache.stats() if _pipeline.cache is not None else None}
+    return {k: v for k, v in stats.items() if v is not None}
+
+def _publish_stats():
+    # Other workers' snapshots are at most STATS_PUBLISH_S old; the answering worker's is live
+    while True:
+        try:
+            for name, stats in _local_stats().items():
+                SHARED.publish(name, stats)
+        except Exception as e:
+            print(f"⚠️  Stats publish failed: {e}")
+        time.sleep(STATS_PUBLISH_S)
+
+def _stats(name: str) -> dict:
+    """One worker's stats, or with api/serve.py the sum over all workers plus each one's."""
+    local = _local_stats()[name]
+    if SHARED is None:
+        return local
+    SHARED.publish(name, local)
+    return SHARED.collect(name)
+
+@app.on_event("shutdown")
+async def shutdown():
+    if _watcher is not None:
+        _watcher.close()
+    if _pipeline is not None and _pipeline.briefings is not None:
+        _pipeline.briefings.close()
 
 class LogEntry(BaseModel):
     destination_port:       Optional[float] = 0
@@ -27,9 +83,12 @@ class LogEntry(BaseModel):
     fwd_packet_length_mean: Optional[float] = 0
     bwd_packet_length_mean: Optional[float] = 0
 
-@app.post("/analyze")
-def analyze(log: LogEntry):
-    return _pipeline.analyze({
+class LogBatch(BaseModel):
+    logs:    List[LogEntry]
+    explain: Optional[bool] = True
+
+def _to_flow(log: LogEntry) -> dict:
+    return {
         "Destination Port":       log.destination_port,
         "Flow Duration":          log.flow_duration,
         "Total Fwd Packets":      log.total_fwd_packets,
@@ -38,8 +97,229 @@ def analyze(log: LogEntry):
         "Flow Bytes/s":           log.flow_bytes_per_s,
         "Fwd Packet Length Mean": log.fwd_packet_length_mean,
         "Bwd Packet Length Mean": log.bwd_packet_length_mean,
-    })
+    }
+
+@app.post("/analyze")
+def analyze(log: LogEntry, explain: bool = True):
+    return _pipeline.analyze(_to_flow(log), explain=explain)
+
+@app.post("/analyze/stream")
+def analyze_stream(log: LogEntry):
+    # NDJSON: classification first, then partial briefing text, then the final briefing
+    flow   = _to_flow(log)
+    result = _pipeline.analyze(flow, explain=False)
+
+    def events():
+        yield json.dumps({"event": "classification", "result": result}) + "\n"
+        if not result["is_threat"]:
+            return
+        templated = _pipeline.policy.render(result["attack_type"], flow,
+                                            result["confidence"], result["severity"])
+        if templated is not None:
+            yield json.dumps({"event": "briefing", "briefing": templated}) + "\n"
+        else:
+            for event in _pipeline.explainer.explain_stream(
+                    result["attack_type"], flow, result["confidence"]):
+                kind = "partial" if "partial" in event else "briefing"
+                yield json.dumps({"event": kind, "briefing": event[kind]}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@app.post("/analyze/batch")
+def analyze_batch(batch: LogBatch):
+    t0      = time.perf_counter()
+    results = _pipeline.analyze_batch([_to_flow(l) for l in batch.logs], explain=batch.explain)
+    return {
+        "count":    len(results),
+        "results":  results,
+        "total_ms": round((time.perf_counter() - t0) * 1000, 3),
+    }
+
+def _score_frame(body: bytes, content_type: str):
+    m = _pipeline.models
+    try:
+        if content_type == frames.ARROW_TYPE:
+            columns, X = frames.decode_arrow(body)
+        else:
+            header, X = frames.decode_frame(body)
+            columns   = header["columns"]
+        X = frames.select_features(columns, X, m.feature_cols)
+    except KeyError as e:
+        raise HTTPException(status_code=422, detail=f"Frame is missing model features: {e.args[0]}")
+    except (ValueError, TypeError, OSError) as e:     # pyarrow.ArrowInvalid is a ValueError
+        raise HTTPException(status_code=400, detail=f"Malformed frame: {e}")
+
+    t0 = time.perf_counter()
+    pred_enc, confidence = _pipeline.classify_matrix(X, m)
+    classifier_ms = round((time.perf_counter() - t0) * 1000, 3)
+    classes  = [str(c) for c in m.le.classes_]
+    severity = [SEVERITY_MAP.get(c, 'MEDIUM') for c in classes]
+
+    if content_type == frames.ARROW_TYPE:
+        import pyarrow as pa
+        idx  = pa.array(pred_enc.astype(np.int32))
+        body = frames.encode_arrow({
+            "attack_type": pa.DictionaryArray.from_arrays(idx, pa.array(classes)),
+            "severity":    pa.DictionaryArray.from_arrays(idx, pa.array(severity)),
+            "confidence":  pa.array(confidence.astype(np.float32)),
+            "is_threat":   pa.array(np.array([c != 'BENIGN' for c in classes])[pred_enc]),
+        })
+    else:
+        body = frames.encode_frame(["class", "confidence"],
+                                   np.column_stack([pred_enc, confidence]),
+                                   classes=classes, severity=severity,
+                                   model_version=m.version, classifier_ms=classifier_ms)
+    return Response(content=body, media_type=content_type,
+                    headers={"X-Model-Version": m.version, "X-Classifier-Ms": str(classifier_ms)})
+
+@app.post("/analyze/frame")
+async def analyze_frame(request: Request):
+    # All 20 features in one binary frame; classification only (briefings: /analyze)
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in (frames.FRAME_TYPE, frames.ARROW_TYPE):
+        raise HTTPException(status_code=415,
+                            detail=f"Send {frames.FRAME_TYPE} or {frames.ARROW_TYPE}")
+    body = await request.body()
+    return await run_in_threadpool(_score_frame, body, content_type)
+
+def _parse_flows(text: str) -> list:
+    """One flow object, a JSON array of them, or NDJSON lines → normalized flow dicts."""
+    try:
+        items = json.loads(text)
+    except ValueError:
+        items = [json.loads(line) for line in text.splitlines() if line.strip()]
+    items = items if isinstance(items, list) else [items]
+    feature_cols, flows = _pipeline.models.feature_cols, []
+    for item in items:
+        if not isinstance(item, dict):
+            raise ValueError(f"flows must be JSON objects, got {type(item).__name__}")
+        flow = {c: float(item[c]) for c in feature_cols if item.get(c) is not None}
+        flow["id"] = item.get("id")
+        flows.append(flow)
+    return flows
+
+def _score_stream_batch(flows: list, explain: bool) -> list:
+    m = _pipeline.models
+    pred_enc, confidence = _pipeline.classify_matrix(_pipeline.to_matrix(flows, m), m)
+    results = []
+    for flow, k, conf in zip(flows, pred_enc.tolist(), confidence.tolist()):
+        attack_type = str(m.le.classes_[k])
+        result = {
+            "id":          flow["id"],
+            "attack_type": attack_type,
+            "severity":    SEVERITY_MAP.get(attack_type, 'MEDIUM'),
+            "confidence":  round(conf, 1),
+            "is_threat":   attack_type != 'BENIGN',
+        }
+        if explain and result["is_threat"]:
+            # Template or a briefing_id to poll — never waits on the LLM
+            result["briefing"] = _pipeline.brief(attack_type, flow, conf)
+        results.append(result)
+    return results
+
+@app.websocket("/ws/flows")
+async def flow_stream(ws: WebSocket, explain: bool = False):
+    """
+    Persistent sensor stream. Each text message carries one flow, a JSON array
+    or NDJSON lines (feature_cols keys, optional "id" echoed back). Rows are
+    coalesced into micro-batches; every reply is {"seq": first row, "results": [...]}
+    in arrival order (seq counts accepted rows; a malformed message gets
+    {"error"}). A full per-connection buffer pauses reading → TCP backpressure.
+    """
+    await ws.accept()
+    queue     = asyncio.Queue(maxsize=STREAM_MAX_PENDING)
+    send_lock = asyncio.Lock()      # the reader's error frames and the results share one socket
+
+    async def send(text: str):
+        async with send_lock:
+            await ws.send_text(text)
+
+    async def receive():
+        try:
+            while True:
+                text = await ws.receive_text()
+                try:
+                    flows = _parse_flows(text)
+                except (ValueError, TypeError) as e:
+                    await send(json.dumps({"error": f"Malformed message: {e}"}))
+                    continue
+                for flow in flows:
+                    await queue.put(flow)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            await queue.put(None)
+
+    reader, seq, done = asyncio.create_task(receive()), 0, False
+    try:
+        while not done:
+            first = await queue.get()
+            if first is None:
+                break
+            if queue.empty():
+                await asyncio.sleep(STREAM_WINDOW_MS / 1000)
+            batch = [first]
+            while len(batch) < STREAM_BATCH_ROWS and not queue.empty():
+                flow = queue.get_nowait()
+                if flow is None:
+                    done = True
+                    break
+                batch.append(flow)
+            results = await run_in_threadpool(_score_stream_batch, batch, explain)
+            await send(json.dumps({"seq": seq, "results": results}))
+            seq += len(batch)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        reader.cancel()
+
+@app.get("/briefing/{briefing_id}")
+def briefing(briefing_id: str, wait: float = 0.0):
+    # wait > 0 → long-poll up to `wait` seconds for the briefing to finish
+    entry = _pipeline.briefings.get(briefing_id, wait_s=min(max(wait, 0.0), 30.0))
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired briefing_id")
+    return entry
+
+@app.get("/briefing")
+def briefing_stats():
+    return _stats("briefing")
+
+@app.get("/explainer/policy")
+def explainer_policy():
+    return _pipeline.policy.stats()
+
+@app.get("/explainer/cache")
+def explainer_cache():
+    return _stats("explainer_cache")
+
+@app.get("/classifier/cache")
+def classifier_cache():
+    if _pipeline.cache is None:
+        raise HTTPException(404, "Prediction cache disabled")
+    return _stats("classifier_cache")
+
+@app.get("/metrics")
+def metrics():
+    # Prometheus text exposition: per-stage latency histograms, class and LLM-outcome counters
+    return Response(_pipeline.metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.post("/admin/reload")
+def admin_reload():
+    # Sync handler → loads in the threadpool; other requests keep using the old model
+    try:
+        return _pipeline.reload()
+    except Exception as e:
+        raise HTTPException(status_code=409,
+                            detail=f"Reload rejected, still serving {_pipeline.models.version}: {e}")
 
 @app.get("/health")
 def health():
-    return {"status":"ok","egress":"zero","version":"1.0.0"}
+    models = _pipeline.models
+    return {"status":"ok","egress":"zero","version":"1.0.0",
+            "pid":              os.getpid(),
+            "model_version":    models.version,
+            "model_loaded_at":  models.loaded_at,
+            "model_source":     models.source,
+            "startup_ms":       _pipeline.startup_ms,
+            "previous_version": _pipeline.previous_version}
@@ -3,6 +3,7 @@ import random, sys, os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from src.pipeline    import SecureInferPipeline
 from src.gpu_monitor import get_gpu_stats
+from src.metrics     import Histogram
 
 st.set_page_config(
     page_title="SecureInfer | AMD Slingshot",
@@ -63,16 +64,16 @@ if 'pipeline' not in st.session_state:
     with st.spinner("⏳ Loading SecureInfer pipeline..."):
         st.session_state.pipeline = SecureInferPipeline()
     st.session_state.alerts = []
-    st.session_state.stats  = {"total":0,"threats":0,"critical":0,"latencies":[]}
+    st.session_state.stats  = {"total":0,"threats":0,"critical":0,"latency":Histogram()}
     st.rerun()
 
 s   = st.session_state.stats
-avg = round(sum(s["latencies"])/len(s["latencies"])) if s["latencies"] else 0
+avg = round(s["latency"].mean_ms())
 k1,k2,k3,k4 = st.columns(4)
 k1.metric("🔍 Analyzed", s["total"])
 k2.metric("🚨 Threats",  s["threats"])
 k3.metric("🔴 Critical", s["critical"])
-k4.metric("⚡ Avg ms",   avg)
+k4.metric("⚡ Avg ms",   avg, help=f"p95 {s['latency'].quantile_ms(0.95):.0f} ms")
 
 # ── SAMPLES: exact values extracted from YOUR trained model's test set ──
 # Each entry is guaranteed to be predicted correctly by your classifier
@@ -436,7 +437,7 @@ clr = b4.button("🗑️ Clear",            use_container_width=True)
 
 if clr:
     st.session_state.alerts = []
-    st.session_state.stats  = {"total":0,"threats":0,"critical":0,"latencies":[]}
+    st.session_state.stats  = {"total":0,"threats":0,"critical":0,"latency":Histogram()}
     st.rerun()
 
 trigger = None
@@ -446,13 +447,18 @@ if nrm: trigger = next(s for s in SAMPLES if s["_name"] == "Normal Traffic")
 
 if trigger:
     name = trigger.pop("_name")
+    live = st.empty()
+    def show_partial(fields):
+        # Stream the briefing summary into the feed as phi3 generates it
+        live.markdown(f"🔍 **{name}** — _{fields.get('summary', '')}_ ▌")
     with st.spinner(f"🔍 Analyzing `{name}`..."):
-        result = st.session_state.pipeline.analyze(trigger)
+        result = st.session_state.pipeline.analyze(trigger, on_partial=show_partial)
+    live.empty()    # final briefing is in → drop the partial text, the feed card shows it
     trigger["_name"] = name
     result["_name"]  = name
     s = st.session_state.stats
     s["total"] += 1
-    s["latencies"].append(result["total_ms"])
+    s["latency"].record_ms(result["total_ms"])
     if result["is_threat"]:              s["threats"]  += 1
     if result["severity"] == "CRITICAL": s["critical"] += 1
     st.session_state.alerts.insert(0, result)
@@ -478,7 +484,7 @@ for alert in st.session_state.alerts[:20]:
     <span class="meta" style="margin-left:10px">
       Confidence: {alert['confidence']}% &nbsp;|&nbsp;
       Classifier: {alert['classifier_ms']}ms &nbsp;|&nbsp;
-      LLM: {alert['llm_ms']}ms &nbsp;|&nbsp;
+      LLM: {alert['llm_ms']}ms (first token {alert.get('ttft_ms', alert['llm_ms'])}ms) &nbsp;|&nbsp;
       Total: {alert['total_ms']}ms
     </span>
   </div>
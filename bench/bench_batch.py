@@ -0,0 +1,35 @@
+"""
+Stage-1 throughput: per-row SecureInferPipeline.analyze vs analyze_batch.
+Run from the repo root after training:  python3 bench/bench_batch.py [n_flows]
+"""
+import numpy as np, time, sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.pipeline import SecureInferPipeline
+
+def load_flows(pipe, n: int) -> list:
+    # X_test.npy is already scaled → undo it to get realistic raw flows
+    X_raw = pipe.scaler.inverse_transform(np.load("models/X_test.npy")[:n])
+    return [dict(zip(pipe.feature_cols, row)) for row in X_raw.tolist()]
+
+def main():
+    n     = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    pipe  = SecureInferPipeline(cache_size=0)     # batch pass must not reuse per-row results
+    flows = load_flows(pipe, n)
+    n     = len(flows)
+
+    t0 = time.perf_counter()
+    per_row = [pipe.analyze(f, explain=False)["attack_type"] for f in flows]
+    row_s   = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batched = [r["attack_type"] for r in pipe.analyze_batch(flows, explain=False)]
+    batch_s = time.perf_counter() - t0
+
+    print(f"📊 {n:,} flows")
+    print(f"   per-row : {n / row_s:>12,.0f} flows/s  ({row_s * 1e6 / n:.1f} µs/flow)")
+    print(f"   batch   : {n / batch_s:>12,.0f} flows/s  ({batch_s * 1e6 / n:.1f} µs/flow)")
+    print(f"   speedup : {row_s / batch_s:.1f}x")
+    print(f"   labels agree: {per_row == batched}")
+
+if __name__ == "__main__":
+    main()
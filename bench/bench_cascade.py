@@ -0,0 +1,64 @@
+"""
+Two-tier cascade: gate (train_classifier.py --gate) + full forest only for
+flows the gate cannot clear as BENIGN, vs the full forest on every flow.
+Run from the repo root after training with --gate:
+    python3 bench/bench_cascade.py [batch_rows] [single_flows]
+Uses the API's opt-in compiled configuration (SECUREINFER_COMPILED=1:
+compiled forest, bulk booster for batches); the prediction cache is off so
+every row is really scored.
+"""
+import numpy as np, time, sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.pipeline import SecureInferPipeline
+
+def best_of(fn, reps: int = 3) -> float:
+    best = float("inf")
+    for _ in range(reps):
+        t0   = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    batch_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    n_single   = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    cascade = SecureInferPipeline(compiled=True, cache_size=0)
+    m       = cascade.models
+    if m.gate is None:
+        sys.exit("❌ No cascade gate — run: python3 src/train_classifier.py --gate-only")
+    full    = SecureInferPipeline(compiled=True, cache_size=0, cascade=False, models=m)
+    m.bulk_booster(wait=True)
+
+    X_raw  = m.scaler.inverse_transform(np.load("models/X_test.npy"))
+    y_test = np.load("models/y_test.npy")
+    benign = m.gate_benign
+
+    def run(pipe):
+        return np.concatenate([pipe.classify_matrix(X_raw[i:i + batch_rows])[0]
+                               for i in range(0, len(X_raw), batch_rows)])
+
+    pred_full, pred_casc = run(full), run(cascade)
+    attack    = y_test != benign
+    cleared   = m.gate_exit((X_raw - m._mean) / m._scale)[0]
+    recall    = lambda pred: (pred[attack] != benign).mean()
+    print(f"📊 X_test: {len(X_raw):,} flows ({(~attack).mean():.1%} BENIGN), gate threshold "
+          f"p(attack) < {m.gate_threshold:.4f}")
+    print(f"   Early exits         : {cleared.mean():.1%} of flows, {cleared[~attack].mean():.1%} of BENIGN")
+    print(f"   Attack recall       : full {recall(pred_full):.4%} | cascade {recall(pred_casc):.4%}")
+    print(f"   Label agreement     : {(pred_full == pred_casc).mean():.4%} with the full forest")
+
+    t_full, t_casc = best_of(lambda: run(full)), best_of(lambda: run(cascade))
+    print(f"   Batches of {batch_rows:,}: full {len(X_raw) / t_full:>10,.0f} flows/s | "
+          f"cascade {len(X_raw) / t_casc:>10,.0f} flows/s ({t_full / t_casc:.2f}×)")
+
+    flows = [dict(zip(m.feature_cols, row)) for row in X_raw[:n_single].tolist()]
+    for f in flows[:50]:
+        full._classify_fast(f), cascade._classify_fast(f)
+    t_full = best_of(lambda: [full._classify_fast(f) for f in flows])
+    t_casc = best_of(lambda: [cascade._classify_fast(f) for f in flows])
+    print(f"   Single flow        : full {t_full / n_single * 1e6:>7.1f} µs | "
+          f"cascade {t_casc / n_single * 1e6:>7.1f} µs ({t_full / t_casc:.2f}×)")
+
+if __name__ == "__main__":
+    main()
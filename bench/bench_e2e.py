@@ -0,0 +1,357 @@
+"""
+End-to-end benchmark: a replayable synthetic workload through the whole
+pipeline, in-process and over HTTP, against a local Ollama stand-in.
+Run from the repo root after training:
+    python3 bench/bench_e2e.py [--requests 2000] [--mix "Normal Traffic=80,*=20"]
+                               [--llm-dist lognormal] [--json out.json] [--compare old.json]
+The workload is app.py's per-class SAMPLES (read from the source, so
+streamlit is never imported) drawn with the class mix and a multiplicative
+jitter; --seed makes it identical run to run. Both modes use the API's
+opt-in compiled configuration (api/serve.py --compiled: compiled forest,
+fast path), async briefings and an bench/ollama_stub.py subprocess found
+through OLLAMA_HOST. Per-stage latencies come from the pipeline's own
+histograms (src/metrics.py); over HTTP they are scraped from GET /metrics,
+so percentiles are interpolated within its buckets. Diff the --json output
+between commits, or hand the older file to --compare.
+"""
+import argparse, ast, http.client, json, os, re, resource, subprocess, sys, threading, time
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+from bench_workers import FIELDS, free_port, wait_healthy
+from src.metrics import LLM_OUTCOMES
+
+BENIGN_SAMPLE = "Normal Traffic"
+QUANTILES     = (50, 95, 99)
+
+def load_samples(path: str = os.path.join(ROOT, "app.py")) -> dict:
+    """SAMPLES literal from app.py → {class name: flow}, without executing the app."""
+    for node in ast.parse(open(path).read()).body:
+        if isinstance(node, ast.Assign) and getattr(node.targets[0], "id", None) == "SAMPLES":
+            return {s.pop("_name"): s for s in ast.literal_eval(node.value)}
+    raise ValueError(f"no SAMPLES list in {path}")
+
+def parse_mix(spec: str, names: list) -> dict:
+    """"Normal Traffic=80,DDoS=5,*=15" → class → probability; * is split over the rest."""
+    weights, rest = {}, 0.0
+    for part in spec.split(","):
+        name, _, w = part.rpartition("=")
+        if name == "*":
+            rest = float(w)
+        elif name in names:
+            weights[name] = float(w)
+        else:
+            raise ValueError(f"unknown class {name!r} in --mix (known: {', '.join(names)})")
+    others = [n for n in names if n not in weights]
+    for n in others:
+        weights[n] = rest / len(others)
+    total = sum(weights.values())
+    return {n: w / total for n, w in weights.items() if w > 0}
+
+def make_workload(samples: dict, mix: dict, n: int, jitter: float, seed: int) -> tuple:
+    """n flows drawn per the mix → (flows, the SAMPLES class each was drawn from)."""
+    rng    = np.random.default_rng(seed)
+    names  = list(mix)
+    picked = rng.choice(len(names), size=n, p=[mix[k] for k in names])
+    flows, classes = [], [names[k] for k in picked.tolist()]
+    for k in picked.tolist():
+        flow  = dict(samples[names[k]])
+        scale = rng.uniform(1 - jitter, 1 + jitter, len(flow))
+        # Multiplicative → zero-valued features stay zero; the port is an identity, not a size
+        flows.append({c: v if c == "Destination Port" else float(v * s)
+                      for (c, v), s in zip(flow.items(), scale.tolist())})
+    return flows, classes
+
+def latency_stats(lat_ms) -> dict:
+    lat = np.asarray(lat_ms)
+    return {"mean_ms": round(float(lat.mean()), 4),
+            **{f"p{q}_ms": round(float(np.percentile(lat, q)), 4) for q in QUANTILES}}
+
+def agreement(classes: list, predicted: list) -> float:
+    expected = ["BENIGN" if c == BENIGN_SAMPLE else c for c in classes]
+    return round(float(np.mean([e == p for e, p in zip(expected, predicted)])), 4)
+
+def start_stub(args) -> tuple:
+    port = free_port()
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "bench", "ollama_stub.py"),
+                             "--port", str(port), "--latency-ms", str(args.llm_latency_ms),
+                             "--jitter-ms", str(args.llm_jitter_ms), "--distribution", args.llm_dist,
+                             "--parallel", str(args.llm_parallel), "--fail-rate", str(args.llm_fail_rate)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(200):
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/api/tags")
+            conn.getresponse().read()
+            return proc, f"127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.05)
+    proc.terminate()
+    raise TimeoutError("Ollama stub did not start")
+
+def drained(stats: dict) -> bool:
+    return stats["completed"] + stats["dropped"] >= stats["submitted"]
+
+def wait_drained(get_stats, timeout_s: float) -> dict:
+    deadline = time.perf_counter() + timeout_s
+    stats    = get_stats()
+    while not drained(stats) and time.perf_counter() < deadline:
+        time.sleep(0.1)
+        stats = get_stats()
+    return dict(stats, drained=drained(stats))
+
+# ── In-process ──────────────────────────────────────────────────────────────
+def run_inprocess(flows: list, classes: list, args) -> dict:
+    from src.pipeline import SecureInferPipeline
+    pipe = SecureInferPipeline(async_briefings=True, compiled=True, low_latency=True)
+    pipe.models.bulk_booster(wait=True)         # its background load would skew the first timings
+    for f in flows[:args.warmup]:
+        pipe.analyze(f, explain=False)
+    wait_drained(pipe.briefings.stats, args.drain_s)
+    pipe.metrics.reset()
+
+    lat, predicted = [], []
+    t0 = time.perf_counter()
+    for f in flows:
+        t = time.perf_counter()
+        predicted.append(pipe.analyze(f, explain=args.explain)["attack_type"])
+        lat.append((time.perf_counter() - t) * 1000)
+    wall = time.perf_counter() - t0
+    briefings = wait_drained(pipe.briefings.stats, args.drain_s)
+    m = pipe.metrics
+    return {
+        "requests":       len(flows),
+        "throughput_rps": round(len(flows) / wall, 1),
+        "latency":        latency_stats(lat),
+        "stages":         m.summary(),
+        "predictions":    {c: int(n) for c, n in zip(m.classes, m.predicted.sum(axis=0)) if n},
+        "llm_outcomes":   {o: int(n) for o, n in zip(LLM_OUTCOMES, m.outcomes.sum(axis=0))},
+        "briefings":      briefings,
+        "agreement":      agreement(classes, predicted),
+        # ru_maxrss is KB on Linux: this process — pipeline, workload and harness
+        "peak_rss_mb":    round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+# ── HTTP ────────────────────────────────────────────────────────────────────
+_METRIC_RE = re.compile(r'secureinfer_(stage_seconds_bucket|stage_seconds_sum|predictions_total|'
+                        r'llm_outcomes_total)\{\w+="([^"]+)"(?:,le="([^"]+)")?\} (\S+)')
+
+def get(port: int, path: str) -> bytes:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.request("GET", path)
+    return conn.getresponse().read()
+
+def scrape(port: int) -> dict:
+    """GET /metrics → {"buckets": {stage: {le: n}}, "sum": {stage: s}, "predictions": ..., "llm_outcomes": ...}"""
+    out = {"buckets": {}, "sum": {}, "predictions": {}, "llm_outcomes": {}}
+    for kind, label, le, value in _METRIC_RE.findall(get(port, "/metrics").decode()):
+        if kind == "stage_seconds_bucket":
+            out["buckets"].setdefault(label, {})[float(le)] = float(value)
+        elif kind == "stage_seconds_sum":
+            out["sum"][label] = float(value)
+        else:
+            out[kind.replace("_total", "")][label] = int(float(value))
+    return out
+
+def bucket_quantile(q: float, les: list, cum: list) -> float:
+    """Prometheus histogram_quantile: linear within the bucket holding the q-quantile."""
+    rank = q * cum[-1]
+    i    = next(i for i, c in enumerate(cum) if c >= rank)
+    if les[i] == float("inf"):
+        return les[i - 1]
+    lo, below = (les[i - 1], cum[i - 1]) if i else (0.0, 0.0)
+    return lo + (les[i] - lo) * (rank - below) / max(cum[i] - below, 1)
+
+def stage_summary(before: dict, after: dict) -> dict:
+    out = {}
+    for stage, buckets in after["buckets"].items():
+        les = sorted(buckets)
+        cum = [buckets[le] - before["buckets"].get(stage, {}).get(le, 0) for le in les]
+        if cum[-1] <= 0:
+            continue
+        seconds = after["sum"][stage] - before["sum"].get(stage, 0.0)
+        out[stage] = {"count": int(cum[-1]), "mean_ms": round(seconds / cum[-1] * 1000, 4),
+                      **{f"p{q}_ms": round(bucket_quantile(q / 100, les, cum) * 1000, 4)
+                         for q in QUANTILES}}
+    return out
+
+def vm_hwm_mb(pid: int) -> float:
+    """Peak RSS (VmHWM) in MB summed over pid and its direct children (pre-fork workers)."""
+    pids = [pid]
+    try:
+        pids += [int(c) for c in open(f"/proc/{pid}/task/{pid}/children").read().split()]
+    except OSError:
+        pass
+    kb = 0
+    for p in pids:
+        try:
+            kb += next(int(l.split()[1]) for l in open(f"/proc/{p}/status") if l.startswith("VmHWM:"))
+        except (OSError, StopIteration):
+            pass
+    return round(kb / 1024, 1)
+
+def replay(port: int, bodies: list, clients: int, explain: bool) -> tuple:
+    """bodies split over `clients` keep-alive connections → (latencies ms, classes, errors, wall s)."""
+    path, headers = f"/analyze?explain={str(explain).lower()}", {"Content-Type": "application/json"}
+    lat, predicted, errors = [None] * len(bodies), [None] * len(bodies), [0] * clients
+
+    def client(c: int):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        for i in range(c, len(bodies), clients):
+            t = time.perf_counter()
+            try:
+                conn.request("POST", path, bodies[i], headers)
+                r    = conn.getresponse()
+                body = r.read()
+                if r.status == 200:
+                    predicted[i] = json.loads(body)["attack_type"]
+                else:
+                    errors[c] += 1
+            except (OSError, http.client.HTTPException):
+                errors[c] += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            lat[i] = (time.perf_counter() - t) * 1000
+
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return lat, predicted, sum(errors), time.perf_counter() - t0
+
+def run_http(flows: list, classes: list, args) -> dict:
+    # /analyze takes the LogEntry subset of the features (api/server.py::_to_flow)
+    bodies = [json.dumps({f: f_[c] for f, c in FIELDS.items() if c in f_}).encode() for f_ in flows]
+    port   = free_port()
+    proc   = subprocess.Popen([sys.executable, os.path.join(ROOT, "api", "serve.py"),
+                               "--workers", str(args.workers), "--port", str(port), "--compiled"],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_healthy(port)
+        replay(port, bodies[:args.warmup], args.clients, explain=False)
+        before = scrape(port)
+        lat, predicted, errors, wall = replay(port, bodies, args.clients, args.explain)
+        # GET /briefing sums every worker (the others' counts up to STATS_PUBLISH_S old)
+        briefings = wait_drained(lambda: json.loads(get(port, "/briefing")), args.drain_s)
+        after     = scrape(port)
+        peak_mb   = vm_hwm_mb(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    return {
+        "requests":       len(flows),
+        "errors":         errors,
+        "workers":        args.workers,
+        "clients":        args.clients,
+        "throughput_rps": round(len(flows) / wall, 1),
+        "latency":        latency_stats(lat),
+        "stages":         stage_summary(before, after),
+        "predictions":    {c: n - before["predictions"].get(c, 0)
+                           for c, n in after["predictions"].items() if n > before["predictions"].get(c, 0)},
+        "llm_outcomes":   {o: n - before["llm_outcomes"].get(o, 0) for o, n in after["llm_outcomes"].items()},
+        "briefings":      briefings,
+        "agreement":      agreement(classes, predicted),
+        "peak_rss_mb":    peak_mb,       # VmHWM, server parent + workers
+    }
+
+# ── Report ──────────────────────────────────────────────────────────────────
+def git_commit() -> dict:
+    try:
+        head  = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    cwd=ROOT, capture_output=True, text=True).stdout.strip())
+        return {"commit": head or None, "dirty": dirty}
+    except OSError:
+        return {"commit": None, "dirty": None}
+
+def print_mode(name: str, r: dict):
+    lat = r["latency"]
+    print(f"\n📊 {name}: {r['throughput_rps']:>9,.1f} req/s | p50 {lat['p50_ms']:.3f} ms | "
+          f"p95 {lat['p95_ms']:.3f} ms | p99 {lat['p99_ms']:.3f} ms | peak RSS {r['peak_rss_mb']:,.0f} MB"
+          + (f" | errors {r['errors']}" if r.get("errors") else ""))
+    print(f"   {'stage':<20}{'count':>8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}  (ms)")
+    for stage, s in r["stages"].items():
+        print(f"   {stage:<20}{s['count']:>8}{s['mean_ms']:>10.3f}{s['p50_ms']:>10.3f}"
+              f"{s['p95_ms']:>10.3f}{s['p99_ms']:>10.3f}")
+    b = r["briefings"]
+    print(f"   LLM outcomes {r['llm_outcomes']} | briefings {b['completed']} done, "
+          f"{b['dropped']} dropped{'' if b['drained'] else ' (not drained)'} | "
+          f"label agreement {r['agreement']:.1%}")
+
+def compare(old: dict, new: dict):
+    """Throughput and p99 per stage, old → new, for modes and stages both runs have."""
+    print(f"\n🔁 vs {old.get('commit') or 'baseline'}{' (dirty)' if old.get('dirty') else ''}:")
+    for mode in ("inprocess", "http"):
+        if mode not in old or mode not in new:
+            continue
+        o, n = old[mode], new[mode]
+        print(f"   {mode:<9} throughput {o['throughput_rps']:>9,.1f} → {n['throughput_rps']:>9,.1f} req/s "
+              f"({n['throughput_rps'] / o['throughput_rps'] - 1:+.1%}) | peak RSS "
+              f"{o['peak_rss_mb']:,.0f} → {n['peak_rss_mb']:,.0f} MB")
+        for stage in [s for s in n["stages"] if s in o["stages"]]:
+            a, b = o["stages"][stage]["p99_ms"], n["stages"][stage]["p99_ms"]
+            print(f"      {stage:<20} p99 {a:>9.3f} → {b:>9.3f} ms" + (f" ({b / a - 1:+.1%})" if a else ""))
+
+def parse_args():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--requests", type=int,   default=2000)
+    ap.add_argument("--mix",      default=f"{BENIGN_SAMPLE}=80,*=20",
+                    help='class=weight list over app.py SAMPLES names; "*" spreads over the rest')
+    ap.add_argument("--jitter",   type=float, default=0.05, help="per-feature ± relative jitter")
+    ap.add_argument("--seed",     type=int,   default=0)
+    ap.add_argument("--modes",    default="inprocess,http")
+    ap.add_argument("--no-explain", dest="explain", action="store_false",
+                    help="classification only (default: briefings queued for threats)")
+    ap.add_argument("--warmup",   type=int,   default=200, help="requests before measuring")
+    ap.add_argument("--drain-s",  type=float, default=30.0, help="wait this long for queued briefings")
+    ap.add_argument("--workers",  type=int,   default=1, help="HTTP: api/serve.py workers")
+    ap.add_argument("--clients",  type=int,   default=8, help="HTTP: concurrent keep-alive connections")
+    ap.add_argument("--llm-latency-ms", type=float, default=300.0)
+    ap.add_argument("--llm-jitter-ms",  type=float, default=100.0)
+    ap.add_argument("--llm-dist",       default="lognormal", choices=("normal", "lognormal", "exponential"))
+    ap.add_argument("--llm-parallel",   type=int,   default=1)
+    ap.add_argument("--llm-fail-rate",  type=float, default=0.0)
+    ap.add_argument("--json",     help="write the report here")
+    ap.add_argument("--compare",  help="earlier --json report to print deltas against")
+    return ap.parse_args()
+
+def main():
+    args    = parse_args()
+    samples = load_samples()
+    mix     = parse_mix(args.mix, list(samples))
+    flows, classes = make_workload(samples, mix, args.requests, args.jitter, args.seed)
+    stub, host     = start_stub(args)
+    os.environ["OLLAMA_HOST"] = host            # in-process pipeline and the server subprocess
+    report = dict(git_commit(), config={
+        k: getattr(args, k) for k in ("requests", "jitter", "seed", "explain", "warmup",
+                                      "llm_latency_ms", "llm_jitter_ms", "llm_dist", "llm_parallel",
+                                      "llm_fail_rate")
+    }, mix={k: round(v, 4) for k, v in mix.items()})
+    print(f"🧪 {args.requests:,} flows from {len(mix)} classes (seed {args.seed}, ±{args.jitter:.0%} jitter) | "
+          f"LLM stub {args.llm_dist} {args.llm_latency_ms:.0f}±{args.llm_jitter_ms:.0f} ms on {host}")
+    try:
+        modes = args.modes.split(",")
+        if "inprocess" in modes:
+            report["inprocess"] = run_inprocess(flows, classes, args)
+            print_mode("In-process", report["inprocess"])
+        if "http" in modes:
+            report["http"] = run_http(flows, classes, args)
+            print_mode(f"HTTP ({args.workers} worker(s), {args.clients} clients)", report["http"])
+    finally:
+        stub.terminate()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\n💾 Report → {args.json}")
+    if args.compare:
+        compare(json.load(open(args.compare)), report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Stage-1 single-flow latency: default (pandas/sklearn) vs low-latency path.
+Run from the repo root after training:  python3 bench/bench_fast_path.py [n_flows]
+Target: p50 < 100 µs for the low-latency path.
+"""
+import numpy as np, time, sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.pipeline import SecureInferPipeline
+
+def load_flows(pipe, n: int) -> list:
+    X_raw = pipe.scaler.inverse_transform(np.load("models/X_test.npy")[:n])
+    return [dict(zip(pipe.feature_cols, row)) for row in X_raw.tolist()]
+
+def time_each(fn, flows) -> np.ndarray:
+    out = np.empty(len(flows))
+    for i, f in enumerate(flows):
+        t0     = time.perf_counter()
+        fn(f)
+        out[i] = time.perf_counter() - t0
+    return out * 1e6
+
+def report(name: str, us: np.ndarray):
+    p50, p99 = np.percentile(us, [50, 99])
+    print(f"   {name:<12}: p50 {p50:>9.1f} µs | p99 {p99:>9.1f} µs")
+
+def main():
+    n     = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    pipe  = SecureInferPipeline(low_latency=True, cache_size=0)     # every pass really scores
+    flows = load_flows(pipe, n)
+
+    for f in flows[:50]:     # warm up booster + thread-local buffers
+        pipe._classify_fast(f)
+
+    fast = time_each(pipe._classify_fast, flows)
+
+    pipe.low_latency = False
+    slow   = time_each(lambda f: pipe.analyze(f, explain=False), flows[:500])
+    labels = [pipe.analyze(f, explain=False)["attack_type"] for f in flows[:500]]
+    agree  = labels == [pipe._classify_fast(f)[0] for f in flows[:500]]
+
+    print(f"📊 Stage-1 latency over {len(flows):,} flows")
+    report("default", slow)
+    report("low-latency", fast)
+    print(f"   labels agree: {agree}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Packet → flow assembly throughput on a synthetic pcap (Ethernet/IPv4,
+TCP + UDP, interleaved flows, TCP sessions closed by FIN).
+Run from the repo root after training:
+    python3 bench/bench_flowmeter.py [packets] [flows]
+Reports pcap decode alone, decode + flow assembly, and decode + assembly +
+classification (src/score.py's path) in packets/s.
+"""
+import os, sys, time, tempfile, resource
+import numpy as np
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import flowmeter
+
+# One snaplen-54 record: pcap header | Ethernet | IPv4 | TCP (UDP uses the first 8 bytes)
+RECORD = np.dtype([
+    ("sec", "<u4"), ("usec", "<u4"), ("incl", "<u4"), ("orig", "<u4"),
+    ("macs", "V12"), ("etype", ">u2"),
+    ("vihl", "u1"), ("tos", "u1"), ("tot", ">u2"), ("id", ">u2"), ("frag", ">u2"),
+    ("ttl", "u1"), ("proto", "u1"), ("csum", ">u2"), ("src", ">u4"), ("dst", ">u4"),
+    ("sport", ">u2"), ("dport", ">u2"), ("seq", ">u4"), ("ack", ">u4"),
+    ("doff", "u1"), ("flags", "u1"), ("win", ">u2"), ("l4csum", ">u2"), ("urg", ">u2"),
+])
+
+def write_synthetic_pcap(path: str, packets: int = 1_000_000, flows: int = 20_000, seed: int = 0) -> int:
+    rng    = np.random.default_rng(seed)
+    size   = np.maximum(1, rng.geometric(flows / packets, flows))
+    flow   = np.repeat(np.arange(flows), size)
+    n      = len(flow)
+    starts = np.cumsum(size) - size
+    iat    = rng.exponential(0.05, n)
+    c      = np.cumsum(iat)
+    ts     = rng.uniform(0, 300, flows)[flow] + c - np.repeat(c[starts], size)   # 5 min capture
+    first  = np.zeros(n, dtype=bool); first[starts] = True
+    last   = np.zeros(n, dtype=bool); last[starts + size - 1] = True
+    tcp    = (rng.random(flows) < 0.8)[flow]
+    fwd    = first | (rng.random(n) < 0.5)
+
+    client, server = (10 << 24) + rng.integers(0, 1 << 16, flows), (192 << 24) + (168 << 16) + rng.integers(0, 256, flows)
+    cport,  sport  = rng.integers(1024, 65535, flows), rng.choice([22, 53, 80, 443, 8080], flows)
+    payload = rng.integers(0, 1400, n) * (rng.random(n) < 0.7)
+
+    order = np.argsort(ts, kind="stable")
+    rec   = np.zeros(n, dtype=RECORD)
+    t     = ts[order]
+    rec["sec"], rec["usec"] = np.floor(t), (t % 1) * 1e6
+    rec["incl"]  = 54
+    l4hdr        = np.where(tcp, 20, 8)
+    rec["orig"]  = (14 + 20 + l4hdr + payload)[order]
+    rec["etype"], rec["vihl"], rec["ttl"] = 0x0800, 0x45, 64
+    rec["tot"]   = (20 + l4hdr + payload)[order]
+    rec["proto"] = np.where(tcp, 6, 17)[order]
+    rec["src"]   = np.where(fwd, client[flow], server[flow])[order]
+    rec["dst"]   = np.where(fwd, server[flow], client[flow])[order]
+    rec["sport"] = np.where(fwd, cport[flow], sport[flow])[order]
+    rec["dport"] = np.where(fwd, sport[flow], cport[flow])[order]
+    flags        = np.where(last, 0x11, 0x10) | np.where(rng.random(n) < 0.3, 0x08, 0)
+    rec["doff"]  = np.where(tcp, 0x50, 0)[order]
+    rec["flags"] = np.where(tcp, flags, 0)[order]
+    with open(path, "wb") as f:
+        f.write(np.array([0xA1B2C3D4], "<u4").tobytes() + np.array([2, 4], "<u2").tobytes()
+                + np.array([0, 0, 65535, 1], "<u4").tobytes())
+        f.write(rec.tobytes())
+    return n
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+def main():
+    packets = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    flows   = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.pcap")
+        n    = write_synthetic_pcap(path, packets, flows)
+        print(f"📊 Synthetic pcap: {n:,} packets, {flows:,} flows, {os.path.getsize(path) / 1e6:.0f} MB")
+
+        _, t_read = timed(lambda: sum(len(p["ts"]) for p in flowmeter.PcapReader(path)))
+        print(f"   decode            : {n / t_read:>12,.0f} packets/s")
+
+        def assemble():
+            meter = flowmeter.FlowMeter()
+            rows  = sum(len(meter.add(p)["X"]) for p in flowmeter.PcapReader(path))
+            return rows + len(meter.flush()["X"])
+        rows, t_flow = timed(assemble)
+        print(f"   decode + assemble : {n / t_flow:>12,.0f} packets/s | {rows:,} flows")
+
+        from src.pipeline import SecureInferPipeline
+        from src.frames import select_features
+        pipeline = SecureInferPipeline(cache_size=0)
+        m        = pipeline.models
+        def classify():
+            threats = 0
+            for block in flowmeter.read_flows(path):
+                X = select_features(flowmeter.FEATURES, block["X"], m.feature_cols)
+                pred_enc, _ = pipeline.classify_matrix(X, m)
+                threats += int((m.le.classes_[pred_enc] != "BENIGN").sum())
+            return threats
+        threats, t_all = timed(classify)
+        print(f"   + classify        : {n / t_all:>12,.0f} packets/s | {threats:,} flagged")
+        print(f"   Peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+if __name__ == "__main__":
+    main()
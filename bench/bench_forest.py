@@ -0,0 +1,42 @@
+"""
+CompiledForest vs XGBClassifier.predict_proba at several batch sizes.
+Run from the repo root after training:  python3 bench/bench_forest.py [sizes...]
+"""
+import numpy as np, pickle, time, sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.forest import CompiledForest
+
+SIZES = [1, 64, 4096, 1_000_000]
+
+def best_of(fn, X, budget_s: float = 2.0) -> float:
+    fn(X[:64])                                   # warm up
+    runs, spent, best = 0, 0.0, float("inf")
+    while runs == 0 or (spent < budget_s and runs < 1000):
+        t0    = time.perf_counter()
+        fn(X)
+        took  = time.perf_counter() - t0
+        best  = min(best, took)
+        spent += took
+        runs  += 1
+    return best
+
+def main():
+    sizes  = [int(a) for a in sys.argv[1:]] or SIZES
+    model  = pickle.load(open("models/classifier.pkl", "rb"))
+    model.get_booster().set_param({"device": "cpu"})
+    forest = CompiledForest.from_booster(model.get_booster())
+    X_test = np.load("models/X_test.npy").astype(np.float32)
+    print(f"🌲 {len(forest.roots)} trees · depth ≤ {forest.max_depth} · {forest.n_classes} classes")
+
+    rng = np.random.default_rng(42)
+    print(f"   {'batch':>9} | {'xgboost':>14} | {'compiled':>14} | {'speedup':>7} | agree")
+    for n in sizes:
+        X     = X_test[rng.integers(0, len(X_test), n)]
+        t_xgb = best_of(model.predict_proba, X)
+        t_cf  = best_of(forest.predict_proba, X)
+        agree = (model.predict_proba(X).argmax(1) == forest.predict(X)).mean() * 100
+        print(f"   {n:>9,} | {t_xgb * 1e3:>11.3f} ms | {t_cf * 1e3:>11.3f} ms | "
+              f"{t_xgb / t_cf:>6.2f}x | {agree:.2f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Bulk scoring over HTTP: JSON /analyze/batch (8 LogEntry fields) vs binary
+/analyze/frame (all features) as a raw float32 frame and as Arrow IPC.
+Run from the repo root after training:  python3 bench/bench_frame.py [batch_rows] [reps]
+In-process (FastAPI TestClient); request bodies are encoded once up front,
+timings include server decode + classify + encode and client response decode.
+"""
+import json, os, sys, time
+import numpy as np
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fastapi.testclient import TestClient
+from src import frames
+import api.server as server
+from bench.bench_workers import FIELDS
+
+def main():
+    n    = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    reps = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with TestClient(server.app) as client:
+        m      = server._pipeline.models
+        X_test = np.load("models/X_test.npy")
+        X_raw  = m.scaler.inverse_transform(X_test[np.arange(n) % len(X_test)]).astype(np.float32)
+        idx    = {c: j for j, c in enumerate(m.feature_cols)}
+
+        json_body  = json.dumps({"explain": False, "logs": [
+            {f: float(row[idx[c]]) for f, c in FIELDS.items()} for row in X_raw]}).encode()
+        frame_body = frames.encode_frame(m.feature_cols, X_raw)
+        arrow_body = frames.encode_arrow({c: X_raw[:, j] for j, c in enumerate(m.feature_cols)})
+
+        def via_json():
+            r = client.post("/analyze/batch", content=json_body,
+                            headers={"Content-Type": "application/json"})
+            return [x["attack_type"] for x in r.json()["results"]]
+
+        def via_frame():
+            r = client.post("/analyze/frame", content=frame_body,
+                            headers={"Content-Type": frames.FRAME_TYPE})
+            header, out = frames.decode_frame(r.content)
+            return np.asarray(header["classes"])[out[:, 0].astype(np.int64)].tolist()
+
+        def via_arrow():
+            import pyarrow as pa
+            r = client.post("/analyze/frame", content=arrow_body,
+                            headers={"Content-Type": frames.ARROW_TYPE})
+            return pa.ipc.open_stream(r.content).read_all().column("attack_type").to_pylist()
+
+        expected = server._pipeline.classify_batch(X_raw.astype(np.float64))[0].tolist()
+        print(f"📊 {n:,} flows per request, best of {reps}")
+        for name, fn, body in (("JSON batch", via_json, json_body),
+                               ("raw frame", via_frame, frame_body),
+                               ("Arrow IPC", via_arrow, arrow_body)):
+            labels = fn()                                   # warm-up + correctness
+            best   = float("inf")
+            for _ in range(reps):
+                t0   = time.perf_counter()
+                fn()
+                best = min(best, time.perf_counter() - t0)
+            agree = "8 of 20 features" if name == "JSON batch" else \
+                    f"labels match classify_batch: {labels == expected}"
+            print(f"   {name:<10}: {len(body) / 1e6:>6.2f} MB request | {best * 1000:>8.1f} ms | "
+                  f"{n / best:>10,.0f} flows/s | {agree}")
+
+if __name__ == "__main__":
+    main()
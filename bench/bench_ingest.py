@@ -0,0 +1,40 @@
+"""
+Peak RSS and wall time of CSV ingest + preprocess: full pd.read_csv/concat
+path vs chunked float32 streaming into a Parquet store.
+Run from the repo root (needs data/*.csv):  python3 bench/bench_ingest.py [chunksize]
+Each path runs in its own subprocess inside a scratch dir, so models/ is untouched.
+"""
+import json, os, subprocess, sys, tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+from src import data_prep
+t0 = time.time()
+if {stream}:
+    X, *_ = data_prep.preprocess_store(data_prep.load_data_streaming({chunksize}, store="store/flows.parquet"))
+else:
+    X, *_ = data_prep.preprocess(data_prep.load_data())
+print(json.dumps({{"rows": len(X), "wall_s": time.time() - t0,
+                  "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+"""
+
+def run(stream: bool, chunksize: int) -> dict:
+    with tempfile.TemporaryDirectory() as scratch:
+        os.symlink(os.path.abspath("data"), os.path.join(scratch, "data"))
+        code = CHILD.format(root=ROOT, stream=stream, chunksize=chunksize)
+        out  = subprocess.run([sys.executable, "-c", code], cwd=scratch,
+                              capture_output=True, text=True, check=True)
+        return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    chunksize = int(sys.argv[1]) if len(sys.argv) > 1 else 250_000
+    print(f"📊 Ingest + preprocess (chunksize {chunksize:,})")
+    for name, stream in (("full read", False), ("streaming", True)):
+        r = run(stream, chunksize)
+        print(f"   {name:<10}: {r['rows']:>10,} rows | {r['wall_s']:>7.1f} s | peak RSS {r['peak_rss_mb']:>8.0f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Per-flow LLM briefings vs cross-flow prompt micro-batching, against the
+local Ollama stand-in (bench/ollama_stub.py, one generation at a time).
+    python3 bench/bench_prompt_batching.py [n_requests] [concurrency]
+"""
+import numpy as np, threading, time, sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from ollama_stub import start_stub
+from src.explainer import ThreatExplainer
+from src.prompt_batcher import PromptBatcher
+
+ATTACKS = ['DDoS', 'PortScan', 'Bot', 'DoS Hulk', 'FTP-Patator', 'SSH-Patator']
+
+def run(explain, n: int, concurrency: int) -> dict:
+    lat, lock, idx = [], threading.Lock(), iter(range(n))
+
+    def worker():
+        while True:
+            with lock:
+                i = next(idx, None)
+            if i is None:
+                return
+            flow = {"Destination Port": 80 + i, "Flow Duration": 1000 * i}   # distinct → no coalescing
+            t0   = time.perf_counter()
+            explain(ATTACKS[i % len(ATTACKS)], flow, 97.0)
+            with lock:
+                lat.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    wall = time.perf_counter() - t0
+    p50, p95 = np.percentile(lat, [50, 95])
+    return {"per_s": n / wall, "p50": p50, "p95": p95}
+
+def main():
+    n           = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    _, url, cfg = start_stub(latency_ms=200, jitter_ms=20, item_ms=40, token_ms=0, parallel=1)
+
+    per_flow = ThreatExplainer(base_url=url)
+    batcher  = PromptBatcher(ThreatExplainer(base_url=url), window_ms=50, max_items=8)
+
+    print(f"📊 {n} briefings · {concurrency} concurrent callers · stub 200±20 ms + 40 ms/extra flow")
+    for name, fn in (("per-flow", per_flow.explain), ("micro-batch", batcher.explain)):
+        r = run(fn, n, concurrency)
+        print(f"   {name:<12}: {r['per_s']:>6.1f} briefings/s | p50 {r['p50']:>7.0f} ms | p95 {r['p95']:>7.0f} ms")
+    print(f"   batcher: {batcher.stats()}")
+
+if __name__ == "__main__":
+    main()
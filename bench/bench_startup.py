@@ -0,0 +1,88 @@
+"""
+Cold start: `import api.server` time and launch → first /health 200, with the
+models loaded from pickles vs the single-file model.npz bundle, and the bundle
+served compiled (SECUREINFER_COMPILED=1 — xgboost is never imported).
+Run from the repo root after training:  python3 bench/bench_startup.py [runs] [--track FILE]
+Each mode runs in a scratch dir holding a copy of models/, so models/ is untouched.
+--track appends one JSON line per run of this script (e.g. bench/startup_history.jsonl).
+Target: well under 1 s to first /health OK with the compiled bundle.
+"""
+import json, os, shutil, socket, subprocess, sys, tempfile, time, urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from src.model_registry import MODEL_FILES, OPTIONAL_FILES
+
+IMPORT = "import time; t = time.perf_counter(); import api.server; print((time.perf_counter() - t) * 1000)"
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def scratch_models(scratch: str, bundle: bool):
+    models = os.path.join(scratch, "models")
+    os.makedirs(models)
+    for name in MODEL_FILES + OPTIONAL_FILES:
+        if os.path.exists(os.path.join("models", name)):
+            shutil.copy2(os.path.join("models", name), models)
+    if bundle:
+        from src.model_bundle import bundle_dir
+        bundle_dir(models)
+
+def time_import(scratch: str, env: dict) -> float:
+    out = subprocess.run([sys.executable, "-c", IMPORT], cwd=scratch, env=env,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+def time_health(scratch: str, env: dict, timeout_s: float = 60.0) -> float:
+    port = free_port()
+    url  = f"http://127.0.0.1:{port}/health"
+    t0   = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "api.server:app", "--port", str(port),
+                             "--log-level", "warning"], cwd=scratch, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - t0 < timeout_s:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as r:
+                    if r.status == 200:
+                        return (time.perf_counter() - t0) * 1000, json.loads(r.read())
+            except OSError:
+                time.sleep(0.005)
+        raise TimeoutError(f"/health not OK after {timeout_s}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+def main():
+    args  = [a for a in sys.argv[1:] if not a.startswith("--")]
+    runs  = int(args[0]) if args and args[0].isdigit() else 3
+    track = sys.argv[sys.argv.index("--track") + 1] if "--track" in sys.argv else None
+    env   = dict(os.environ, PYTHONPATH=ROOT)
+
+    report = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "runs": runs}
+    print(f"📊 Cold start, median of {runs} run(s)")
+    for mode, bundle, compiled in (("pickles", False, "0"), ("bundle", True, "0"), ("compiled", True, "1")):
+        with tempfile.TemporaryDirectory() as scratch:
+            scratch_models(scratch, bundle)
+            mode_env = dict(env, SECUREINFER_COMPILED=compiled)
+            imports  = sorted(time_import(scratch, mode_env) for _ in range(runs))
+            health   = [time_health(scratch, mode_env) for _ in range(runs)]
+            first   = sorted(ms for ms, _ in health)
+            info    = health[-1][1]
+        report[mode] = {"import_ms":    round(imports[runs // 2]),
+                        "first_health_ms": round(first[runs // 2]),
+                        "pipeline_ms":  info.get("startup_ms"),
+                        "source":       info.get("model_source")}
+        r = report[mode]
+        print(f"   {mode:<8}: import api.server {r['import_ms']:>5} ms | launch → /health OK "
+              f"{r['first_health_ms']:>5} ms | pipeline init {r['pipeline_ms']:>5} ms ({r['source']})")
+
+    if track:
+        with open(track, "a") as f:
+            f.write(json.dumps(report) + "\n")
+        print(f"📜 Appended to {track}")
+
+if __name__ == "__main__":
+    main()
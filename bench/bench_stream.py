@@ -0,0 +1,93 @@
+"""
+Sensor-style load on a real server (api/serve.py): persistent /ws/flows
+streams vs one POST /analyze per flow, same number of concurrent sensors.
+Run from the repo root after training:
+    python3 bench/bench_stream.py [--sensors 8] [--window 64] [--duration 10]
+--window caps unacknowledged flows per WebSocket (client-side flow control);
+latency is send → result for every flow.
+"""
+import argparse, asyncio, json, multiprocessing as mp, os, subprocess, sys, time
+import numpy as np
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from bench.bench_workers import load_bodies, free_port, wait_healthy, client
+
+def load_flows(n: int = 2000) -> list:
+    from src.pipeline import ModelSet
+    m     = ModelSet(compiled=True)
+    X_raw = m.scaler.inverse_transform(np.load("models/X_test.npy")[:n])
+    return [json.dumps(dict(zip(m.feature_cols, row))) for row in X_raw.tolist()]
+
+async def sensor(url: str, flows: list, duration: float, window: int, offset: int) -> tuple:
+    import websockets
+    lat, sizes, sent = [], [], []
+    credits = asyncio.Semaphore(window)
+    async with websockets.connect(url, max_size=None) as ws:
+        async def send():
+            i, stop = offset, time.perf_counter() + duration
+            while time.perf_counter() < stop:
+                await credits.acquire()
+                sent.append(time.perf_counter())
+                await ws.send(flows[i % len(flows)])
+                i += 1
+
+        async def receive():
+            while True:
+                msg = json.loads(await ws.recv())
+                now = time.perf_counter()
+                sizes.append(len(msg["results"]))
+                for k in range(len(msg["results"])):
+                    lat.append(now - sent[msg["seq"] + k])
+                    credits.release()
+
+        receiver = asyncio.create_task(receive())
+        await send()
+        while len(lat) < len(sent):          # drain what is still in flight
+            await asyncio.sleep(0.01)
+        receiver.cancel()
+    return lat, sizes
+
+async def run_sensors(url: str, flows: list, sensors: int, duration: float, window: int):
+    return await asyncio.gather(*[sensor(url, flows, duration, window, s * 97) for s in range(sensors)])
+
+def report(name: str, lat: np.ndarray, wall: float, extra: str = ""):
+    lat = lat * 1000
+    print(f"   {name:<16}: {len(lat) / wall:>9,.0f} flows/s | p50 {np.percentile(lat, 50):>7.2f} ms | "
+          f"p99 {np.percentile(lat, 99):>7.2f} ms{extra}")
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sensors",  type=int, default=8, help="concurrent connections")
+    ap.add_argument("--window",   type=int, default=64, help="max unacknowledged flows per stream")
+    ap.add_argument("--duration", type=float, default=10.0, help="seconds per mode")
+    args = ap.parse_args()
+
+    flows, bodies = load_flows(), load_bodies()
+    port = free_port()
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "api", "serve.py"),
+                             "--workers", "1", "--port", str(port)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_healthy(port)
+        print(f"📊 {args.sensors} sensors · {args.duration:.0f}s per mode · window {args.window}")
+
+        url = f"ws://127.0.0.1:{port}/ws/flows"
+        asyncio.run(run_sensors(url, flows, args.sensors, 1.0, args.window))        # warm-up
+        t0   = time.perf_counter()
+        out  = asyncio.run(run_sensors(url, flows, args.sensors, args.duration, args.window))
+        wall = time.perf_counter() - t0
+        sizes = np.concatenate([o[1] for o in out])
+        report("WebSocket stream", np.concatenate([o[0] for o in out]), wall,
+               f" | mean micro-batch {sizes.mean():.1f} rows")
+
+        with mp.get_context("fork").Pool(args.sensors) as pool:
+            t0   = time.perf_counter()
+            res  = pool.map(client, [(port, bodies, args.duration, s * 97) for s in range(args.sensors)])
+            wall = time.perf_counter() - t0
+        report("POST per flow", np.concatenate([r[0] for r in res]), wall)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+RPS and latency of the pre-fork server (api/serve.py) per worker count.
+Run from the repo root after training:
+    python3 bench/bench_workers.py [--workers 1,2,4] [--clients 8] [--duration 10]
+Each worker count gets a fresh server; client processes hammer POST
+/analyze?explain=false over keep-alive connections with flows from X_test.
+Memory: RSS summed over parent + workers vs PSS (shared pages counted once).
+"""
+import argparse, http.client, json, multiprocessing as mp, os, socket, subprocess, sys, time
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# LogEntry field → model feature (inverse of api/server.py::_to_flow)
+FIELDS = {
+    "destination_port":       "Destination Port",
+    "flow_duration":          "Flow Duration",
+    "total_fwd_packets":      "Total Fwd Packets",
+    "total_backward_packets": "Total Backward Packets",
+    "packet_length_mean":     "Packet Length Mean",
+    "flow_bytes_per_s":       "Flow Bytes/s",
+    "fwd_packet_length_mean": "Fwd Packet Length Mean",
+    "bwd_packet_length_mean": "Bwd Packet Length Mean",
+}
+
+def load_bodies(n: int = 2000) -> list:
+    from src.pipeline import ModelSet
+    m     = ModelSet(compiled=True)
+    X_raw = m.scaler.inverse_transform(np.load("models/X_test.npy")[:n])
+    idx   = {col: i for i, col in enumerate(m.feature_cols)}
+    return [json.dumps({f: float(row[idx[c]]) for f, c in FIELDS.items() if c in idx}).encode()
+            for row in X_raw]
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_healthy(port: int, timeout_s: float = 60.0):
+    t0 = time.time()
+    while time.time() - t0 < timeout_s:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError(f"server on :{port} not healthy after {timeout_s}s")
+
+def memory_mb(pid: int) -> tuple:
+    """(RSS, PSS) in MB summed over pid and its direct children."""
+    pids = [pid]
+    try:
+        pids += [int(c) for c in open(f"/proc/{pid}/task/{pid}/children").read().split()]
+    except OSError:
+        pass
+    rss = pss = 0
+    for p in pids:
+        try:
+            for line in open(f"/proc/{p}/smaps_rollup"):
+                if line.startswith("Rss:"):
+                    rss += int(line.split()[1])
+                elif line.startswith("Pss:"):
+                    pss += int(line.split()[1])
+        except OSError:
+            pass
+    return rss / 1024, pss / 1024
+
+def client(args) -> tuple:
+    port, bodies, duration, offset = args
+    conn     = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    headers  = {"Content-Type": "application/json"}
+    lat, err = [], 0
+    deadline = time.perf_counter() + duration
+    i        = offset
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        try:
+            conn.request("POST", "/analyze?explain=false", bodies[i % len(bodies)], headers)
+            r = conn.getresponse()
+            r.read()
+            if r.status != 200:
+                err += 1
+        except (OSError, http.client.HTTPException):
+            err += 1
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        lat.append(time.perf_counter() - t0)
+        i += 1
+    return lat, err
+
+def run(workers: int, bodies: list, clients: int, duration: float) -> dict:
+    port = free_port()
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "api", "serve.py"),
+                             "--workers", str(workers), "--port", str(port)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_healthy(port)
+        with mp.get_context("fork").Pool(clients) as pool:
+            pool.map(client, [(port, bodies, 1.0, c * 97) for c in range(clients)])   # warm-up
+            rss, pss = memory_mb(proc.pid)
+            t0  = time.perf_counter()
+            out = pool.map(client, [(port, bodies, duration, c * 97) for c in range(clients)])
+            wall = time.perf_counter() - t0
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    lat = np.concatenate([o[0] for o in out]) * 1000
+    return {
+        "workers": workers,
+        "rps":     len(lat) / wall,
+        "p50_ms":  float(np.percentile(lat, 50)),
+        "p99_ms":  float(np.percentile(lat, 99)),
+        "errors":  sum(o[1] for o in out),
+        "rss_mb":  rss,
+        "pss_mb":  pss,
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--workers",  default="1,2,4", help="comma-separated worker counts")
+    ap.add_argument("--clients",  type=int, default=8, help="concurrent client processes")
+    ap.add_argument("--duration", type=float, default=10.0, help="seconds per worker count")
+    args   = ap.parse_args()
+    bodies = load_bodies()
+
+    print(f"📊 POST /analyze?explain=false · {args.clients} clients · {args.duration:.0f}s each · "
+          f"{os.cpu_count()} core(s)")
+    for w in [int(x) for x in args.workers.split(",")]:
+        r = run(w, bodies, args.clients, args.duration)
+        print(f"   {r['workers']:>2} worker(s): {r['rps']:>8,.0f} req/s | p50 {r['p50_ms']:>7.1f} ms | "
+              f"p99 {r['p99_ms']:>7.1f} ms | errors {r['errors']} | "
+              f"RSS Σ {r['rss_mb']:>6.0f} MB vs PSS {r['pss_mb']:>6.0f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Local stand-in for the Ollama HTTP API (/api/tags, /api/generate) so the
+explainer, API and benchmarks can run without a GPU or a real model.
+
+    python3 bench/ollama_stub.py --port 11435 --latency-ms 300 --jitter-ms 100
+
+Latency is drawn per request from --distribution: "normal" N(latency, jitter)
+clipped at 0, "lognormal" with that mean and standard deviation (a long
+right tail, like real generations), or "exponential" with that mean; with
+"stream": true it is the time to first token, then one NDJSON chunk is sent
+every --token-ms. --fail-rate makes a fraction of generations answer 503.
+--parallel caps concurrent generations like OLLAMA_NUM_PARALLEL, and a
+prompt carrying several "Type:" lines (a micro-batch) is answered with a
+JSON array, costing --item-ms extra per additional flow.
+"""
+import json, math, random, time, argparse, threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+BRIEFING = {
+    "summary":  "Stub briefing: {attack} traffic matches a known attack pattern.",
+    "severity": "HIGH",
+    "impact":   "Possible service disruption on the targeted host.",
+    "action":   "Block the source and review firewall logs.",
+}
+
+DISTRIBUTIONS = ("normal", "lognormal", "exponential")
+
+class StubConfig:
+    def __init__(self, latency_ms=200.0, jitter_ms=0.0, fail_rate=0.0, token_ms=5.0,
+                 item_ms=50.0, parallel=1, model="phi3:mini", distribution="normal"):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"distribution must be one of {DISTRIBUTIONS}, got {distribution!r}")
+        self.latency_ms = latency_ms
+        self.jitter_ms  = jitter_ms
+        self.fail_rate  = fail_rate
+        self.token_ms   = token_ms
+        self.item_ms    = item_ms
+        self.model      = model
+        self.distribution = distribution
+        self.requests   = 0
+        self.lock       = threading.Lock()
+        self.slots      = threading.Semaphore(parallel)
+
+    def delay_s(self, n_items: int = 1) -> float:
+        if self.latency_ms <= 0:
+            ms = 0.0
+        elif self.distribution == "lognormal":
+            sigma = math.sqrt(math.log1p((self.jitter_ms / self.latency_ms) ** 2))
+            ms    = random.lognormvariate(math.log(self.latency_ms) - sigma ** 2 / 2, sigma)
+        elif self.distribution == "exponential":
+            ms = random.expovariate(1 / self.latency_ms)
+        else:
+            ms = random.gauss(self.latency_ms, self.jitter_ms)
+        return max(0.0, ms + self.item_ms * (n_items - 1)) / 1000
+
+def _attacks_from_prompt(prompt: str) -> list:
+    attacks = [line.split(":", 1)[1].strip()
+               for line in prompt.splitlines() if line.startswith("Type:")]
+    return attacks or ["Unknown"]
+
+def make_handler(cfg: StubConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"       # keep-alive, like Ollama
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, code: int, body: dict):
+            data = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/api/tags":
+                return self._send(200, {"models": [{"name": cfg.model}]})
+            self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            length  = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if self.path != "/api/generate":
+                return self._send(404, {"error": "not found"})
+            with cfg.lock:
+                cfg.requests += 1
+            attacks = _attacks_from_prompt(payload.get("prompt", ""))
+            with cfg.slots:
+                time.sleep(cfg.delay_s(len(attacks)))
+            if random.random() < cfg.fail_rate:
+                return self._send(503, {"error": "stub overloaded"})
+
+            briefings = [
+                dict({k: v.format(attack=a) for k, v in BRIEFING.items()}, id=i + 1)
+                for i, a in enumerate(attacks)
+            ]
+            if len(briefings) == 1:
+                briefings[0].pop("id")
+                text = json.dumps(briefings[0])
+            else:
+                text = json.dumps(briefings)
+            if payload.get("stream", True):     # Ollama streams unless told otherwise
+                return self._stream(text)
+            self._send(200, {"model": cfg.model, "response": text, "done": True})
+
+        def _chunk(self, obj: dict):
+            data = json.dumps(obj).encode() + b"\n"
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def _stream(self, text: str):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            tokens = [text[i:i + 4] for i in range(0, len(text), 4)]
+            for tok in tokens:
+                self._chunk({"model": cfg.model, "response": tok, "done": False})
+                time.sleep(cfg.token_ms / 1000)
+            self._chunk({"model": cfg.model, "response": "", "done": True})
+            self.wfile.write(b"0\r\n\r\n")
+
+    return Handler
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass            # clients dropping keep-alive sockets is normal here
+
+def start_stub(port: int = 0, **config):
+    """Start the stub on a background thread → (server, base_url, config)."""
+    cfg    = StubConfig(**config)
+    server = StubServer(("127.0.0.1", port), make_handler(cfg))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", cfg
+
+def main():
+    ap = argparse.ArgumentParser(description="Ollama API stand-in")
+    ap.add_argument("--port",       type=int,   default=11435)
+    ap.add_argument("--latency-ms", type=float, default=200.0)
+    ap.add_argument("--jitter-ms",  type=float, default=0.0)
+    ap.add_argument("--fail-rate",  type=float, default=0.0)
+    ap.add_argument("--token-ms",   type=float, default=5.0)
+    ap.add_argument("--item-ms",    type=float, default=50.0)
+    ap.add_argument("--parallel",   type=int,   default=1)
+    ap.add_argument("--distribution", choices=DISTRIBUTIONS, default="normal")
+    a = ap.parse_args()
+    server, url, _ = start_stub(a.port, latency_ms=a.latency_ms,
+                                jitter_ms=a.jitter_ms, fail_rate=a.fail_rate,
+                                token_ms=a.token_ms, item_ms=a.item_ms, parallel=a.parallel,
+                                distribution=a.distribution)
+    print(f"🧪 Ollama stub listening on {url}  (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
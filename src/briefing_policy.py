@@ -0,0 +1,103 @@
+import json, threading
+from collections import Counter
+
+# Deterministic briefings for high-volume classes. Fields available to the
+# templates: attack, confidence, severity, port, duration, fwd_pkts, bwd_pkts,
+# pkt_len, bytes_s, pkts_s.
+TEMPLATES = {
+    'PortScan': {
+        "summary": "Port scan detected: short probe against port {port:.0f} "
+                   "({fwd_pkts:.0f} fwd / {bwd_pkts:.0f} bwd packets, {pkts_s:,.0f} pkt/s).",
+        "impact":  "Reconnaissance — the source is mapping exposed services for follow-up attacks.",
+        "action":  "Rate-limit or block the scanning source and verify only intended ports are open.",
+    },
+    'DoS Hulk': {
+        "summary": "HTTP flood (DoS Hulk) against port {port:.0f}: "
+                   "{fwd_pkts:.0f} fwd / {bwd_pkts:.0f} bwd packets at {bytes_s:,.0f} B/s.",
+        "impact":  "Web server worker exhaustion; legitimate requests may time out.",
+        "action":  "Enable HTTP rate limiting / WAF challenge and block the offending source.",
+    },
+    'DDoS': {
+        "summary": "Distributed flood toward port {port:.0f} "
+                   "({fwd_pkts:.0f} fwd packets, {bytes_s:,.0f} B/s per flow).",
+        "impact":  "Service availability at risk as bandwidth and connection tables saturate.",
+        "action":  "Engage upstream filtering / scrubbing and rate-limit the targeted service.",
+    },
+}
+GENERIC_TEMPLATE = {
+    "summary": "{attack} detected with {confidence:.0f}% confidence on port {port:.0f}.",
+    "impact":  "Potential unauthorized access or service disruption.",
+    "action":  "Isolate the affected endpoint and review logs immediately.",
+}
+
+# Template only when the classifier is this sure; everything else goes to the LLM
+DEFAULT_RULES = {
+    'PortScan': 99.0,
+    'DoS Hulk': 99.0,
+    'DDoS':     99.0,
+}
+# Rare / high-stakes classes always get a real analyst-style LLM briefing
+ALWAYS_LLM = {'Heartbleed', 'Infiltration'}
+
+def _num(features: dict, key: str) -> float:
+    try:
+        return float(features.get(key, 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+class BriefingPolicy:
+    """
+    Decides per flow whether a deterministic template briefing is good enough
+    (class listed in `rules` and confidence ≥ its threshold) or the LLM is needed.
+    """
+    def __init__(self, rules: dict = None, templates: dict = None, always_llm=None):
+        self.rules      = dict(DEFAULT_RULES if rules is None else rules)
+        self.templates  = dict(TEMPLATES, **(templates or {}))
+        self.always_llm = set(ALWAYS_LLM if always_llm is None else always_llm)
+        self.templated  = Counter()     # per class: LLM calls avoided
+        self.llm        = Counter()     # per class: sent to the LLM
+        self._lock      = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str) -> "BriefingPolicy":
+        """JSON: {"rules": {class: min_confidence}, "templates": {...}, "always_llm": [...]}"""
+        cfg = json.load(open(path))
+        return cls(cfg.get("rules"), cfg.get("templates"), cfg.get("always_llm"))
+
+    def render(self, attack_type: str, features: dict, confidence: float, severity: str):
+        """Template briefing, or None when this flow should go to the LLM."""
+        threshold = self.rules.get(attack_type)
+        if attack_type in self.always_llm or threshold is None or confidence < threshold:
+            with self._lock:
+                self.llm[attack_type] += 1
+            return None
+
+        fields = {
+            "attack":     attack_type,
+            "confidence": confidence,
+            "severity":   severity,
+            "port":       _num(features, 'Destination Port'),
+            "duration":   _num(features, 'Flow Duration'),
+            "fwd_pkts":   _num(features, 'Total Fwd Packets'),
+            "bwd_pkts":   _num(features, 'Total Backward Packets'),
+            "pkt_len":    _num(features, 'Packet Length Mean'),
+            "bytes_s":    _num(features, 'Flow Bytes/s'),
+            "pkts_s":     _num(features, 'Flow Packets/s'),
+        }
+        template = self.templates.get(attack_type, GENERIC_TEMPLATE)
+        briefing = {k: v.format(**fields) for k, v in template.items()}
+        briefing.update(severity=severity, templated=True, inference_ms=0)
+        with self._lock:
+            self.templated[attack_type] += 1
+        return briefing
+
+    def stats(self) -> dict:
+        with self._lock:
+            classes = sorted(set(self.templated) | set(self.llm))
+            return {
+                "llm_calls_avoided": sum(self.templated.values()),
+                "llm_calls":         sum(self.llm.values()),
+                "per_class": {
+                    c: {"templated": self.templated[c], "llm": self.llm[c]} for c in classes
+                },
+            }
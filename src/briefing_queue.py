@@ -0,0 +1,126 @@
+import threading, uuid, json
+from collections import deque, OrderedDict
+
+class BriefingQueue:
+    """
+    Bounded background pool for LLM briefings, so stage 1 never waits on stage 2.
+
+    submit() returns a briefing_id immediately. Identical pending requests
+    (same cache key) are coalesced into one generation; when the queue is
+    full the oldest pending job is dropped ("drop_oldest") or the new one
+    is refused ("reject"). Finished briefings are kept in a bounded LRU.
+    With a SharedStore (api/serve.py) every status change is also written
+    there, so a poll that lands on another worker still finds its briefing.
+    """
+    def __init__(self, explainer, workers: int = 2, max_pending: int = 256,
+                 overflow: str = "drop_oldest", max_results: int = 10_000, store=None):
+        if overflow not in ("drop_oldest", "reject"):
+            raise ValueError(f"overflow must be 'drop_oldest' or 'reject', got {overflow!r}")
+        self.explainer   = explainer
+        self.max_pending = max_pending
+        self.overflow    = overflow
+        self.max_results = max_results
+        self.store       = store
+        self._pending    = deque()              # jobs: {"key", "args", "ids"}
+        self._by_key     = {}                   # key → pending job (for coalescing)
+        self._results    = OrderedDict()        # briefing_id → {"status", "briefing"}
+        self._lock       = threading.Lock()
+        self._work       = threading.Condition(self._lock)     # workers wait here
+        self._done       = threading.Condition(self._lock)     # long-polling readers wait here
+        self._closed     = False
+        self.counts      = {"submitted": 0, "coalesced": 0, "dropped": 0, "completed": 0}
+        self._workers    = [
+            threading.Thread(target=self._run, name=f"briefing-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for w in self._workers:
+            w.start()
+
+    def _key(self, attack_type: str, features: dict, confidence: float) -> str:
+        cache = getattr(self.explainer, "cache", None)
+        if cache is not None:
+            return cache.key(attack_type, features, confidence)
+        return json.dumps([attack_type, round(confidence), sorted(features.items())], default=str)
+
+    def _store(self, ids: list, status: str, briefing=None):
+        for briefing_id in ids:
+            self._results[briefing_id] = {"status": status, "briefing": briefing}
+            self._results.move_to_end(briefing_id)
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
+        if self.store is not None:
+            self.store.put_briefings(ids, status, briefing)
+
+    def submit(self, attack_type: str, features: dict, confidence: float) -> str:
+        briefing_id = uuid.uuid4().hex
+        key         = self._key(attack_type, features, confidence)
+        with self._lock:
+            self.counts["submitted"] += 1
+            self._store([briefing_id], "pending")
+            job = self._by_key.get(key)
+            if job is not None:
+                job["ids"].append(briefing_id)
+                self.counts["coalesced"] += 1
+                return briefing_id
+
+            if len(self._pending) >= self.max_pending:
+                if self.overflow == "reject":
+                    self._store([briefing_id], "dropped")
+                    self.counts["dropped"] += 1
+                    self._done.notify_all()
+                    return briefing_id
+                oldest = self._pending.popleft()
+                del self._by_key[oldest["key"]]
+                self._store(oldest["ids"], "dropped")
+                self.counts["dropped"] += len(oldest["ids"])
+                self._done.notify_all()
+
+            job = {"key": key, "args": (attack_type, features, confidence), "ids": [briefing_id]}
+            self._pending.append(job)
+            self._by_key[key] = job
+            self._work.notify()
+        return briefing_id
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._work.wait()
+                if self._closed:
+                    return
+                job = self._pending.popleft()
+                del self._by_key[job["key"]]     # new arrivals start a fresh job
+
+            try:
+                briefing, status = self.explainer.explain(*job["args"]), "done"
+            except Exception as e:
+                print(f"⚠️  Briefing worker failed: {e}")
+                briefing, status = None, "failed"
+
+            with self._lock:
+                self._store(job["ids"], status, briefing)
+                self.counts["completed"] += len(job["ids"])
+                self._done.notify_all()
+
+    def get(self, briefing_id: str, wait_s: float = 0.0):
+        """Status dict for briefing_id (None if unknown); optionally long-polls until done."""
+        with self._lock:
+            if briefing_id in self._results or self.store is None:
+                self._done.wait_for(
+                    lambda: self._results.get(briefing_id, {}).get("status") != "pending",
+                    timeout=wait_s
+                )
+                entry = self._results.get(briefing_id)
+                return dict(entry, briefing_id=briefing_id) if entry else None
+        # Issued by another worker (or aged out of this LRU) → the shared copy
+        entry = self.store.wait_briefing(briefing_id, wait_s)
+        return dict(entry, briefing_id=briefing_id) if entry else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counts, pending=len(self._pending), workers=len(self._workers))
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._work.notify_all()
@@ -1,9 +1,23 @@
 import pandas as pd
 import numpy as np
-import glob, os, pickle
+import glob, os, pickle, argparse, time, json
+from concurrent.futures import ProcessPoolExecutor
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.model_selection import train_test_split
 
+KEY_FEATURES = [
+    'Destination Port', 'Flow Duration', 'Total Fwd Packets',
+    'Total Backward Packets', 'Total Length of Fwd Packets',
+    'Fwd Packet Length Max', 'Fwd Packet Length Mean',
+    'Bwd Packet Length Max', 'Bwd Packet Length Mean',
+    'Flow Bytes/s', 'Flow Packets/s', 'Flow IAT Mean',
+    'Flow IAT Std', 'Fwd IAT Total', 'Bwd IAT Total',
+    'Fwd PSH Flags', 'Bwd Packets/s', 'Packet Length Mean',
+    'Packet Length Std', 'Average Packet Size'
+]
+STORE_PATH    = "data/flows.parquet"
+MANIFEST_PATH = "models/dataset.json"
+
 def load_data():
     csv_files = glob.glob("data/**/*.csv", recursive=True)
     if not csv_files:
@@ -21,53 +35,219 @@ def load_data():
     print(f"📊 Label distribution:\n{df['Label'].value_counts().to_string()}\n")
     return df
 
-def preprocess(df):
-    df = df.copy()
+def load_data_streaming(chunksize: int = 250_000, store: str = STORE_PATH):
+    """
+    Memory-bounded ingest: CSVs are read chunk by chunk (KEY_FEATURES as
+    float32), rows with inf/NaN in any column are dropped exactly as the serial
+    path drops them, and only KEY_FEATURES + Label are appended as a row group
+    to a Parquet store. Returns the store's path; preprocess_store() fits and
+    scales from it one row group at a time.
+    """
+    import pyarrow as pa, pyarrow.parquet as pq
+
+    csv_files = sorted(glob.glob("data/**/*.csv", recursive=True))
+    if not csv_files:
+        print("❌ No CSV files found in data/")
+        print("   Run the dataset download step first.")
+        return None
+
+    # Headers first: CICIDS columns carry stray spaces, and a feature counts
+    # as available if any file has it (same as the concat in load_data)
+    headers = {f: pd.read_csv(f, nrows=0, encoding='utf-8').columns for f in csv_files}
+    columns = []
+    for cols in headers.values():
+        columns += [c for c in cols.str.strip() if c not in columns]
+    wanted  = [c for c in KEY_FEATURES if c in columns]
+
+    writer, rows = None, 0
+    os.makedirs(os.path.dirname(store) or ".", exist_ok=True)
+    try:
+        for f in csv_files:
+            print(f"  📂 Streaming {os.path.basename(f)}...")
+            raw_names = {c.strip(): c for c in headers[f]}
+            dtypes    = {raw_names[c]: np.float32 for c in wanted if c in raw_names}
+            for chunk in pd.read_csv(f, dtype=dtypes, chunksize=chunksize, encoding='utf-8',
+                                     low_memory=False):
+                chunk.columns = chunk.columns.str.strip()
+                # Every column decides whether a row survives, as in preprocess() after
+                # the concat (a column this file lacks is NaN → the file's rows go)
+                chunk = chunk.reindex(columns=columns)
+                bad   = chunk.isna().any(axis=1) | chunk.isin([np.inf, -np.inf]).any(axis=1)
+                chunk = chunk.loc[~bad, wanted + ['Label']]
+                chunk[wanted] = chunk[wanted].astype(np.float32)
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(store, table.schema)
+                writer.write_table(table)
+                rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    labels = pd.read_parquet(store, columns=['Label'])['Label']
+    print(f"\n✅ Total records: {rows:,}  →  {store}")
+    print(f"📊 Label distribution:\n{labels.value_counts().to_string()}\n")
+    return store
+
+def _load_file(path: str, columns: list, available: list):
+    # Worker: same per-row cleanup as load_data + preprocess, but only the
+    # projected feature matrix and labels travel back to the parent
+    df = pd.read_csv(path, encoding='utf-8', low_memory=False)
+    df.columns = df.columns.str.strip()
+    df = df.reindex(columns=columns)        # columns other files have → NaN, as pd.concat would
     df.replace([np.inf, -np.inf], np.nan, inplace=True)
     df.dropna(inplace=True)
+    X      = df[available].astype(float).to_numpy()
+    labels = df['Label'].to_numpy(dtype=str)
+    return X, labels
 
-    le = LabelEncoder()
-    df['Label_enc'] = le.fit_transform(df['Label'])
-
-    key_features = [
-        'Destination Port', 'Flow Duration', 'Total Fwd Packets',
-        'Total Backward Packets', 'Total Length of Fwd Packets',
-        'Fwd Packet Length Max', 'Fwd Packet Length Mean',
-        'Bwd Packet Length Max', 'Bwd Packet Length Mean',
-        'Flow Bytes/s', 'Flow Packets/s', 'Flow IAT Mean',
-        'Flow IAT Std', 'Fwd IAT Total', 'Bwd IAT Total',
-        'Fwd PSH Flags', 'Bwd Packets/s', 'Packet Length Mean',
-        'Packet Length Std', 'Average Packet Size'
-    ]
-    available = [f for f in key_features if f in df.columns]
-    print(f"✅ Using {len(available)} features")
+def load_arrays_parallel(workers: int = None):
+    """
+    Fan the per-file read → strip → inf/NaN cleanup → projection out over a
+    process pool. Files are merged in sorted order, so the result (and the
+    fitted preprocessors) match the serial load_data + preprocess path.
+    """
+    csv_files = sorted(glob.glob("data/**/*.csv", recursive=True))
+    if not csv_files:
+        print("❌ No CSV files found in data/")
+        print("   Run the dataset download step first.")
+        return None
 
-    X = df[available].astype(float)
-    y = df['Label_enc']
+    columns = []
+    for f in csv_files:
+        for c in pd.read_csv(f, nrows=0, encoding='utf-8').columns.str.strip():
+            if c not in columns:
+                columns.append(c)
+    available = [f for f in KEY_FEATURES if f in columns]
 
-    scaler = StandardScaler()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(_load_file, csv_files,
+                              [columns] * len(csv_files), [available] * len(csv_files)))
+    for f, (X, _) in zip(csv_files, parts):
+        print(f"  📂 Loaded {os.path.basename(f)} ({len(X):,} clean rows)")
+
+    X      = np.concatenate([p[0] for p in parts]) if parts else np.empty((0, len(available)))
+    labels = np.concatenate([p[1] for p in parts]).astype(object)
+    print(f"\n✅ Total clean records: {len(X):,}")
+    print(f"📊 Label distribution:\n{pd.Series(labels).value_counts().to_string()}\n")
+    return X, labels, available
+
+def fit_preprocessors(X, labels, available):
+    le = LabelEncoder()
+    y  = le.fit_transform(labels)
+
+    print(f"✅ Using {len(available)} features")
+    scaler   = StandardScaler()
     X_scaled = scaler.fit_transform(X)
+    save_preprocessors(le, scaler, available)
+    return X_scaled, y, le
 
+def save_preprocessors(le, scaler, available):
     os.makedirs("models", exist_ok=True)
     pickle.dump(le,        open("models/label_encoder.pkl", "wb"))
     pickle.dump(scaler,    open("models/scaler.pkl",        "wb"))
     pickle.dump(available, open("models/feature_cols.pkl",  "wb"))
     print("✅ Preprocessors saved to models/")
+
+def preprocess_store(store: str = STORE_PATH):
+    """
+    preprocess() for a load_data_streaming store without reading it into one
+    frame: the scaler is partial_fit per row group, then each row group is
+    scaled into a preallocated float32 matrix — peak memory is that matrix
+    plus one row group, never a float64 copy of the dataset. Row groups are
+    handed over as float64 DataFrames, so the statistics and the scaling are
+    float64 as in preprocess() and the scaler keeps its feature_names_in_.
+    """
+    import pyarrow.parquet as pq
+    pf        = pq.ParquetFile(store, read_dictionary=['Label'])
+    available = [f for f in KEY_FEATURES if f in pf.schema_arrow.names]
+    groups    = range(pf.num_row_groups)
+    features  = lambda i: pf.read_row_group(i, columns=available).to_pandas().astype(float)
+
+    # Labels stay dictionary-encoded: one int per row instead of a Python string
+    labels = pf.read(columns=['Label']).column('Label').unify_dictionaries().combine_chunks()
+    names  = labels.dictionary.to_numpy(zero_copy_only=False).astype(str)
+    le     = LabelEncoder().fit(names)
+    y      = le.transform(names)[labels.indices.to_numpy()]
+
+    print(f"✅ Using {len(available)} features")
+    scaler = StandardScaler()
+    for i in groups:
+        scaler.partial_fit(features(i))
+    X_scaled, start = np.empty((pf.metadata.num_rows, len(available)), dtype=np.float32), 0
+    for i in groups:
+        X = features(i)
+        X_scaled[start:start + len(X)] = scaler.transform(X)
+        start += len(X)
+    save_preprocessors(le, scaler, available)
+    return X_scaled, y, le, available
+
+def preprocess(df, clean: bool = True):
+    if clean:
+        df = df.copy()
+        df.replace([np.inf, -np.inf], np.nan, inplace=True)
+        df.dropna(inplace=True)
+
+    available = [f for f in KEY_FEATURES if f in df.columns]
+    X_scaled, y, le = fit_preprocessors(df[available].astype(float), df['Label'], available)
     return X_scaled, y, le, available
 
+def save_splits(X_train, X_test, y_train, y_test, available, le):
+    """
+    float32 feature matrices (what XGBoost trains on anyway) + a manifest, so
+    training/eval can np.load(..., mmap_mode='r') instead of copying into RAM.
+    """
+    np.save("models/X_train.npy", np.asarray(X_train, dtype=np.float32))
+    np.save("models/X_test.npy",  np.asarray(X_test,  dtype=np.float32))
+    np.save("models/y_train.npy", np.asarray(y_train, dtype=np.int32))
+    np.save("models/y_test.npy",  np.asarray(y_test,  dtype=np.int32))
+    manifest = {
+        "version":      1,
+        "created":      time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "dtype":        "float32",
+        "n_features":   len(available),
+        "feature_cols": list(available),
+        "classes":      [str(c) for c in le.classes_],
+        "splits": {
+            "train": {"X": "X_train.npy", "y": "y_train.npy", "rows": int(len(X_train))},
+            "test":  {"X": "X_test.npy",  "y": "y_test.npy",  "rows": int(len(X_test))},
+        },
+    }
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump(manifest, f, indent=2)
+
 def main():
-    df = load_data()
-    if df is None:
-        return
-    X, y, le, _ = preprocess(df)
+    ap = argparse.ArgumentParser(description="Prepare CICIDS CSVs for training")
+    ap.add_argument("--stream", action="store_true",
+                    help="chunked float32 ingest via a Parquet store (bounded memory)")
+    ap.add_argument("--chunksize", type=int, default=250_000)
+    ap.add_argument("--workers", type=int, default=0,
+                    help="parse CSVs in a process pool of this size (0 = serial)")
+    args = ap.parse_args()
+
+    t0 = time.time()
+    if args.workers:
+        loaded = load_arrays_parallel(args.workers)
+        if loaded is None:
+            return
+        available = loaded[2]
+        X, y, le  = fit_preprocessors(pd.DataFrame(loaded[0], columns=available), loaded[1], available)
+    elif args.stream:
+        store = load_data_streaming(args.chunksize)
+        if store is None:
+            return
+        X, y, le, available = preprocess_store(store)
+    else:
+        df = load_data()
+        if df is None:
+            return
+        X, y, le, available = preprocess(df)
+    X = X.astype(np.float32, copy=False)    # halve the split's working set
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, random_state=42, stratify=y
     )
-    np.save("models/X_train.npy", X_train)
-    np.save("models/X_test.npy",  X_test)
-    np.save("models/y_train.npy", y_train)
-    np.save("models/y_test.npy",  y_test)
-    print(f"✅ Train: {X_train.shape[0]:,} | Test: {X_test.shape[0]:,}")
+    save_splits(X_train, X_test, y_train, y_test, available, le)
+    print(f"✅ Train: {X_train.shape[0]:,} | Test: {X_test.shape[0]:,} ({round(time.time() - t0, 1)}s)")
     print("🚀 Run next: python3 src/train_classifier.py")
 
 if __name__ == "__main__":
@@ -0,0 +1,123 @@
+import json, math, os, threading, time
+from collections import OrderedDict
+
+# Prompt features → bucketing. Ports are exact (they carry meaning);
+# magnitudes go into log2 buckets so near-identical flood flows collide.
+KEY_FEATURES = {
+    'Destination Port':       'exact',
+    'Flow Duration':          'log2',
+    'Total Fwd Packets':      'log2',
+    'Total Backward Packets': 'log2',
+    'Packet Length Mean':     'log2',
+    'Flow Bytes/s':           'log2',
+}
+
+def _bucket(value, mode: str, steps_per_octave: int):
+    try:
+        v = float(value)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(v) or math.isinf(v):
+        return None
+    if mode == 'exact':
+        return int(v)
+    return int(round(math.log2(1.0 + max(v, 0.0)) * steps_per_octave))
+
+class ExplanationCache:
+    """
+    LRU + TTL cache of LLM briefings keyed on attack type and a quantized
+    flow signature. Optionally snapshotted to a JSON file capped at
+    `max_disk_bytes` (oldest entries are dropped first).
+    """
+    def __init__(self, max_entries: int = 4096, ttl_s: float = 3600.0,
+                 steps_per_octave: int = 2, confidence_band: float = 10.0,
+                 path: str = None, max_disk_bytes: int = 8 << 20, persist_every: int = 32):
+        self.max_entries      = max_entries
+        self.ttl_s            = ttl_s
+        self.steps_per_octave = steps_per_octave
+        self.confidence_band  = confidence_band
+        self.path             = path
+        self.max_disk_bytes   = max_disk_bytes
+        self.persist_every    = persist_every
+        self._entries  = OrderedDict()          # key → (stored_at, briefing)
+        self._lock     = threading.Lock()
+        self._dirty    = 0
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+        self.expired   = 0
+        self.saved_ms  = 0
+        if path and os.path.exists(path):
+            self.load()
+
+    def key(self, attack_type: str, features: dict, confidence: float) -> str:
+        sig = [_bucket(features.get(f), mode, self.steps_per_octave)
+               for f, mode in KEY_FEATURES.items()]
+        band = int(confidence // self.confidence_band) if self.confidence_band else None
+        return json.dumps([attack_type, band, sig])
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] > self.ttl_s:
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits     += 1
+            self.saved_ms += entry[1].get("inference_ms", 0)
+            return dict(entry[1])
+
+    def put(self, key: str, briefing: dict):
+        with self._lock:
+            self._entries[key] = (time.time(), dict(briefing))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._dirty += 1
+            flush = self.path and self._dirty >= self.persist_every
+        if flush:
+            self.save()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries":   len(self._entries),
+            "hits":      self.hits,
+            "misses":    self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expired":   self.expired,
+            "saved_ms":  self.saved_ms,
+        }
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            rows = [[k, t, b] for k, (t, b) in self._entries.items()]
+            self._dirty = 0
+        blob = json.dumps(rows)
+        while rows and len(blob) > self.max_disk_bytes:     # drop oldest until under cap
+            rows = rows[max(1, len(rows) // 10):]
+            blob = json.dumps(rows)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(blob)
+        os.replace(tmp, self.path)
+
+    def load(self):
+        try:
+            rows = json.load(open(self.path))
+        except Exception as e:
+            print(f"⚠️  Explanation cache not loaded ({self.path}): {e}")
+            return
+        now = time.time()
+        with self._lock:
+            for k, t, b in rows[-self.max_entries:]:
+                if now - t <= self.ttl_s:
+                    self._entries[k] = (t, b)
@@ -1,24 +1,269 @@
-import requests, json, re, time
+import json, os, queue, re, time, random, threading
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+BRIEFING_KEYS = ("summary", "severity", "impact", "action")
+_FIELD_RE     = re.compile(r'"(summary|severity|impact|action)"\s*:\s*"((?:[^"\\]|\\.)*)')
+
+def default_base_url() -> str:
+    # Same variable the Ollama CLI reads; the scheme may be left out ("127.0.0.1:11434")
+    host = os.environ.get("OLLAMA_HOST", "localhost:11434")
+    return host if "://" in host else f"http://{host}"
+
+def partial_fields(text: str) -> dict:
+    """Best-effort view of a JSON object still being generated: closed and open string values."""
+    fields = {}
+    for m in _FIELD_RE.finditer(text):
+        value = m.group(2)
+        try:
+            fields[m.group(1)] = json.loads(f'"{value}"')
+        except ValueError:
+            fields[m.group(1)] = value
+    return fields
 
 class ThreatExplainer:
-    def __init__(self):
-        self.url   = "http://localhost:11434/api/generate"
-        self.model = "phi3:mini"
+    def __init__(self, cache=None, base_url: str = None,
+                 max_in_flight: int = 2, connect_timeout: float = 2.0,
+                 read_timeout: float = 45.0, retries: int = 2, backoff_s: float = 0.25,
+                 stream: bool = False, metrics=None):
+        self.base_url  = (base_url or default_base_url()).rstrip("/")
+        self.url       = f"{self.base_url}/api/generate"
+        self.model     = "phi3:mini"
+        self.cache     = cache      # optional ExplanationCache in front of the LLM
+        self.timeout   = (connect_timeout, read_timeout)
+        self.retries   = retries
+        self.backoff_s = backoff_s
+        self.stream    = stream     # stream tokens even without an on_partial callback
+        self.metrics   = metrics    # optional src.metrics.Metrics: LLM stage timings + outcomes
+
+        # The HTTP session (and the requests import) is created on first use, so
+        # constructing the pipeline never waits on Ollama; the semaphore keeps
+        # extra callers queued here instead of piling generations onto Ollama
+        self.max_in_flight = max_in_flight
+        self._session      = None
+        self._session_lock = threading.Lock()
+        self._slots        = threading.BoundedSemaphore(max_in_flight)
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    # One keep-alive pool sized to the concurrency cap
+                    session = requests.Session()
+                    session.mount("http://",  HTTPAdapter(pool_connections=1, pool_maxsize=self.max_in_flight))
+                    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=self.max_in_flight))
+                    self._session = session
+                    # Diagnostics only → off the caller's path
+                    threading.Thread(target=self.check, name="ollama-check", daemon=True).start()
+        return self._session
 
+    def check(self) -> dict:
+        """Probe /api/tags once: is Ollama up and is phi3:mini pulled?"""
         print("🔥 Connecting to Ollama (phi3:mini)...")
         try:
-            r      = requests.get("http://localhost:11434/api/tags", timeout=5)
+            r      = self.session.get(f"{self.base_url}/api/tags", timeout=self.timeout)
             models = [m['name'] for m in r.json().get('models', [])]
             print(f"✅ Ollama connected.")
             print(f"   Available models: {models}")
             if not any("phi3" in m for m in models):
                 print("⚠️  phi3:mini not found. Run: ollama pull phi3:mini")
+            return {"reachable": True, "models": models}
         except Exception as e:
             print(f"❌ Ollama not reachable: {e}")
             print("   Fix: open a new terminal and run: ollama serve")
+            return {"reachable": False, "error": str(e)}
+
+    def _observe(self, stage: str, t0_ns: int):
+        if self.metrics is not None:
+            self.metrics.observe(stage, time.perf_counter_ns() - t0_ns)
+
+    def _outcome(self, outcome: str, n: int = 1):
+        if self.metrics is not None and n:
+            self.metrics.count_outcome(outcome, n)
+
+    def _cached(self, attack_type: str, features: dict, confidence: float):
+        if self.cache is None:
+            return None, None
+        key    = self.cache.key(attack_type, features, confidence)
+        cached = self.cache.get(key)
+        if cached is not None:
+            cached["cached"]       = True
+            cached["inference_ms"] = 0
+            self._outcome("cached")
+        return key, cached
+
+    def _remember(self, key, result: dict):
+        # Only real LLM output is cached — an outage must not pin the fallback text
+        if self.cache is not None and not result.get("fallback"):
+            self.cache.put(key, result)
+
+    def explain(self, attack_type: str, features: dict, confidence: float,
+                on_partial=None) -> dict:
+        """on_partial(fields) → switch to streaming and get partial keys as they arrive."""
+        if on_partial is not None or self.stream:
+            for event in self.explain_stream(attack_type, features, confidence):
+                if "partial" in event and on_partial is not None:
+                    on_partial(event["partial"])
+            return event["briefing"]
+
+        key, cached = self._cached(attack_type, features, confidence)
+        if cached is not None:
+            return cached
+        return self._explain_llm(key, attack_type, features, confidence)
+
+    def _explain_llm(self, key, attack_type: str, features: dict, confidence: float) -> dict:
+        prompt = self._prompt(attack_type, features, confidence)
+        t0 = time.perf_counter()
+        try:
+            with self._slots:
+                t_req = time.perf_counter_ns()
+                raw   = self._post(self._payload(prompt, stream=False)).json().get("response", "")
+                self._observe("llm_request", t_req)
+        except Exception as e:
+            print(f"⚠️  Ollama request failed: {e}")
+            raw = ""
+
+        result = self._parse(raw, attack_type, confidence)
+        result["inference_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        self._remember(key, result)
+        return result
+
+    def explain_many(self, items: list) -> list:
+        """
+        One generation for several flows; items are (attack_type, features, confidence).
+        Returns a briefing per item, or None where the batched answer was missing or
+        invalid — callers fall back to explain() for those.
+        """
+        results, keys, todo = [None] * len(items), [None] * len(items), []
+        for i, item in enumerate(items):
+            keys[i], results[i] = self._cached(*item)
+            if results[i] is None:
+                todo.append(i)
+        if len(todo) == 1:
+            i = todo[0]
+            results[i] = self._explain_llm(keys[i], *items[i])
+        if len(todo) <= 1:
+            return results
+
+        prompt = self._batch_prompt([items[i] for i in todo])
+        t0 = time.perf_counter()
+        try:
+            with self._slots:
+                payload = self._payload(prompt, stream=False)
+                payload["options"].update(num_predict=250 * len(todo), stop=["```"])
+                t_req   = time.perf_counter_ns()
+                raw     = self._post(payload).json().get("response", "")
+                self._observe("llm_request", t_req)
+        except Exception as e:
+            print(f"⚠️  Ollama batch request failed: {e}")
+            raw = ""
+
+        inference_ms = round((time.perf_counter() - t0) * 1000, 3)
+        for i, briefing in zip(todo, self._parse_many(raw, len(todo))):
+            if briefing is not None:
+                briefing.update(inference_ms=inference_ms, batched=len(todo))
+                self._remember(keys[i], briefing)
+            results[i] = briefing
+        return results
+
+    def explain_stream(self, attack_type: str, features: dict, confidence: float):
+        """
+        Streams Ollama's NDJSON tokens. Yields {"partial": {...}} whenever the
+        partially parsed JSON gains text, then a final {"briefing": {...}} that
+        also carries ttft_ms (time to first token). A producer thread reads
+        Ollama and holds the slot; a consumer that stops iterating (a dropped
+        /analyze/stream client) never keeps the slot taken.
+        """
+        key, cached = self._cached(attack_type, features, confidence)
+        if cached is not None:
+            yield {"briefing": cached}
+            return
+
+        events, cancel = queue.Queue(), threading.Event()
+        threading.Thread(target=self._stream_llm, name="llm-stream", daemon=True,
+                         args=(key, attack_type, features, confidence, events, cancel)).start()
+        try:
+            while True:
+                event = events.get()
+                yield event
+                if "briefing" in event:
+                    return
+        finally:
+            cancel.set()        # closed early → the producer stops reading at its next token
+
+    def _stream_llm(self, key, attack_type: str, features: dict, confidence: float,
+                    events: queue.Queue, cancel: threading.Event):
+        prompt  = self._prompt(attack_type, features, confidence)
+        t0      = time.perf_counter()
+        ttft_ms = None
+        raw     = ""
+        shown   = {}
+        try:
+            with self._slots:
+                t_req = time.perf_counter_ns()
+                with self._post(self._payload(prompt, stream=True), stream=True) as response:
+                    for line in response.iter_lines():
+                        if cancel.is_set():
+                            break
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        token = chunk.get("response", "")
+                        if token and ttft_ms is None:
+                            ttft_ms = round((time.perf_counter() - t0) * 1000, 3)
+                        raw   += token
+                        fields = partial_fields(raw)
+                        if fields != shown:
+                            shown = fields
+                            events.put({"partial": fields})
+                        if chunk.get("done"):
+                            break
+                self._observe("llm_request", t_req)
+        except Exception as e:
+            print(f"⚠️  Ollama stream failed: {e}")
+
+        result = self._parse(raw, attack_type, confidence)
+        result["inference_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        result["ttft_ms"]      = ttft_ms if ttft_ms is not None else result["inference_ms"]
+        if not cancel.is_set():     # a cut-off generation is not a briefing worth caching
+            self._remember(key, result)
+        events.put({"briefing": result})
+
+    def _post(self, payload: dict, stream: bool = False):
+        import requests
+        # Retry connection errors, timeouts and 429/5xx with full-jitter backoff
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.post(self.url, json=payload,
+                                             timeout=self.timeout, stream=stream)
+                if response.status_code not in RETRYABLE_STATUS:
+                    response.raise_for_status()
+                    return response
+                error = requests.HTTPError(f"HTTP {response.status_code}", response=response)
+                response.close()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            if attempt == self.retries:
+                raise error
+            time.sleep(random.uniform(0, self.backoff_s * 2 ** attempt))
 
-    def explain(self, attack_type: str, features: dict, confidence: float) -> dict:
-        prompt = f"""You are SecureInfer, an on-device cybersecurity AI analyst.
+    def _payload(self, prompt: str, stream: bool) -> dict:
+        return {
+            "model":  self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": {
+                "temperature": 0.2,
+                "num_predict": 250,
+                "stop": ["\n\n", "```"]
+            }
+        }
+
+    def _prompt(self, attack_type: str, features: dict, confidence: float) -> str:
+        return f"""You are SecureInfer, an on-device cybersecurity AI analyst.
 Respond ONLY with a valid JSON object. No markdown. No text outside JSON.
 Required keys: "summary", "severity", "impact", "action"
 Severity must be exactly one of: SAFE, LOW, MEDIUM, HIGH, CRITICAL
@@ -36,35 +281,69 @@ Flow Bytes/s: {features.get('Flow Bytes/s', 'N/A')}
 
 Respond with JSON only:"""
 
-        t0 = time.time()
-        try:
-            response = requests.post(
-                self.url,
-                json={
-                    "model":  self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.2,
-                        "num_predict": 250,
-                        "stop": ["\n\n", "```"]
-                    }
-                },
-                timeout=120
-            )
-            raw = response.json().get("response", "")
-        except Exception as e:
-            print(f"⚠️  Ollama request failed: {e}")
-            raw = ""
+    def _batch_prompt(self, items: list) -> str:
+        flows = "\n\n".join(
+            f"""Flow {n}:
+Type: {attack_type}
+Confidence: {confidence:.1f}%
+Destination Port: {features.get('Destination Port', 'N/A')}
+Flow Duration: {features.get('Flow Duration', 'N/A')} ms
+Forward Packets: {features.get('Total Fwd Packets', 'N/A')}
+Backward Packets: {features.get('Total Backward Packets', 'N/A')}
+Packet Length Mean: {features.get('Packet Length Mean', 'N/A')}
+Flow Bytes/s: {features.get('Flow Bytes/s', 'N/A')}"""
+            for n, (attack_type, features, confidence) in enumerate(items, 1)
+        )
+        return f"""You are SecureInfer, an on-device cybersecurity AI analyst.
+Respond ONLY with a valid JSON array of exactly {len(items)} objects, one per flow, in order.
+No markdown. No text outside JSON.
+Required keys per object: "id" (the flow number), "summary", "severity", "impact", "action"
+Severity must be exactly one of: SAFE, LOW, MEDIUM, HIGH, CRITICAL
+Keep each object under 80 words total.
 
-        inference_ms = int((time.time() - t0) * 1000)
+Network attacks detected:
 
+{flows}
+
+Respond with the JSON array only:"""
+
+    def _parse_many(self, raw: str, n: int) -> list:
+        # Demultiplex by "id" when present, else by position; invalid entries → None
+        t0, parsed, outcome = time.perf_counter_ns(), None, "parsed"
+        try:
+            parsed = json.loads(raw.strip())
+        except Exception:
+            outcome = "regex_recovered"
+            match   = re.search(r'\[.*\]', raw, re.DOTALL)
+            if match:
+                try:
+                    parsed = json.loads(match.group())
+                except Exception:
+                    pass
+        out = [None] * n
+        if not isinstance(parsed, list):
+            self._observe("llm_parse", t0)
+            return out
+        for pos, obj in enumerate(parsed):
+            if not isinstance(obj, dict) or not all(k in obj for k in BRIEFING_KEYS):
+                continue
+            idx = obj.pop("id", pos + 1)
+            idx = idx - 1 if isinstance(idx, int) and 1 <= idx <= n else pos
+            if idx < n and out[idx] is None:
+                out[idx] = obj
+        self._observe("llm_parse", t0)
+        # Missing entries are counted by the explain() retry that replaces them
+        self._outcome(outcome, sum(b is not None for b in out))
+        return out
+
+    def _parse(self, raw: str, attack_type: str, confidence: float) -> dict:
         # Parse JSON from response
-        result = {}
+        t0, result, outcome = time.perf_counter_ns(), {}, "parsed"
         try:
             # Try direct parse first
             result = json.loads(raw.strip())
         except Exception:
+            outcome = "regex_recovered"
             try:
                 # Extract JSON block if wrapped in text
                 match = re.search(r'\{.*?\}', raw, re.DOTALL)
@@ -73,14 +352,19 @@ Respond with JSON only:"""
             except Exception:
                 pass
 
+        self._observe("llm_parse", t0)
+
         # Fallback if parsing failed
-        if not all(k in result for k in ("summary", "severity", "impact", "action")):
+        if not isinstance(result, dict) or \
+           not all(k in result for k in BRIEFING_KEYS):
+            t0, outcome = time.perf_counter_ns(), "fallback"
             result = {
                 "summary":  f"{attack_type} attack detected with {confidence:.0f}% confidence.",
                 "severity": "HIGH",
                 "impact":   "Potential unauthorized access or service disruption.",
-                "action":   "Isolate the affected endpoint and review logs immediately."
+                "action":   "Isolate the affected endpoint and review logs immediately.",
+                "fallback": True
             }
-
-        result["inference_ms"] = inference_ms
+            self._observe("llm_fallback", t0)
+        self._outcome(outcome)
         return result
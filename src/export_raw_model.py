@@ -0,0 +1,123 @@
+import numpy as np, pickle, json, time
+import pandas as pd
+from xgboost import XGBClassifier, DMatrix
+
+RAW_MODEL_PATH = "models/classifier_raw.json"
+
+def _ordered(x: np.ndarray) -> np.ndarray:
+    """float32 → int64 key with the same order (-0.0 and 0.0 share key 0)."""
+    b = x.astype(np.float32).view(np.int32).astype(np.int64)
+    return np.where(b < 0, -(b & 0x7FFFFFFF), b)
+
+def _from_ordered(k: np.ndarray) -> np.ndarray:
+    return np.where(k < 0, -k | 0x80000000, k).astype(np.uint32).view(np.float32)
+
+def _raw_thresholds(t: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """
+    Smallest float32 raw value r with float32((r - mean) / scale) >= t, so that
+        x < r   ⇔   float32((x - mean) / scale) < t
+    holds exactly for float32 inputs — hist cut points sit on real data values,
+    so naive t * scale + mean would misroute ties. With a large scale_ many
+    raw values share one scaled value, so the boundary is found by bisecting
+    over the float32 bit patterns (~32 rounds), not by stepping ulps.
+    """
+    t = t.astype(np.float32)
+    def at_or_above(k):
+        with np.errstate(over="ignore"):
+            return ((_from_ordered(k).astype(np.float64) - mean) / scale).astype(np.float32) >= t
+    fmax = np.finfo(np.float32).max
+    lo   = np.full(len(t), _ordered(np.array([-fmax]))[0])
+    hi   = np.full(len(t), _ordered(np.array([fmax]))[0])
+    while (lo < hi).any():
+        mid   = (lo + hi) // 2
+        above = at_or_above(mid)
+        hi    = np.where(above, mid, hi)
+        lo    = np.where(above, lo, mid + 1)
+    return _from_ordered(hi)
+
+def fold_scaler(model, scaler) -> bytes:
+    """
+    Push StandardScaler into the split thresholds:
+        (x - mean) / scale < t   ⇔   x < t * scale + mean      (scale > 0)
+    Leaves and tree structure are untouched, so the raw-feature model
+    routes every float32 input to the same leaf as the scaled path. XGBoost
+    casts inputs to float32 before comparing, so a float64 raw value within
+    half a float32 ulp of a folded split can still take the other branch:
+    the exact guarantee holds for float32-representable inputs only.
+    """
+    n_features = scaler.n_features_in_
+    mean  = scaler.mean_  if scaler.mean_  is not None else np.zeros(n_features)
+    scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n_features)
+
+    raw     = json.loads(model.get_booster().save_raw("json"))
+    booster = raw["learner"]["gradient_booster"]
+    if booster["name"] != "gbtree":
+        raise ValueError(f"Only gbtree boosters can be folded, got {booster['name']}")
+
+    for tree in booster["model"]["trees"]:
+        conds = np.asarray(tree["split_conditions"], dtype=np.float64)
+        feats = np.asarray(tree["split_indices"])
+        split = np.asarray(tree["left_children"]) != -1     # leaves hold leaf values
+        if split.any():
+            f = feats[split]
+            conds[split] = _raw_thresholds(conds[split], mean[f], scale[f])
+        tree["split_conditions"] = conds.tolist()
+    return json.dumps(raw).encode()
+
+def _leaves(model, raw_model, scaler, X_raw: np.ndarray) -> tuple:
+    cols     = getattr(scaler, "feature_names_in_", None)
+    X_scaled = scaler.transform(pd.DataFrame(X_raw.astype(np.float64), columns=cols))
+    leaf_old = model.get_booster().predict(DMatrix(X_scaled), pred_leaf=True)
+    leaf_new = raw_model.get_booster().predict(DMatrix(X_raw), pred_leaf=True)
+    return X_scaled, leaf_old, leaf_new
+
+def check_parity(model, raw_model, scaler, X_test: np.ndarray) -> dict:
+    """
+    Exact on float32 raw values (asserted: every row, every tree, same leaf);
+    also reports agreement on the unrounded float64 raw values, which is what
+    JSON flows give the raw-feature model.
+    """
+    X_raw64  = scaler.inverse_transform(X_test)
+    X_raw    = X_raw64.astype(np.float32)
+    X_scaled, leaf_old, leaf_new = _leaves(model, raw_model, scaler, X_raw)
+    bad      = int((leaf_old != leaf_new).any(axis=1).sum())
+    assert bad == 0, f"{bad} rows reach a different leaf in the raw-feature model"
+    p_old = model.predict_proba(X_scaled)
+    p_new = raw_model.predict_proba(X_raw)
+
+    X_scaled64, leaf_old64, leaf_new64 = _leaves(model, raw_model, scaler, X_raw64)
+    p_old64 = model.predict_proba(X_scaled64)
+    p_new64 = raw_model.predict_proba(X_raw64)
+    return {
+        "rows":             len(X_test),
+        "leaf_agree":       float((leaf_old == leaf_new).mean() * 100),
+        "label_agree":      float((p_old.argmax(1) == p_new.argmax(1)).mean() * 100),
+        "max_proba_diff":   float(np.abs(p_old - p_new).max()),
+        "leaf_agree_f64":   float((leaf_old64 == leaf_new64).mean() * 100),
+        "label_agree_f64":  float((p_old64.argmax(1) == p_new64.argmax(1)).mean() * 100),
+    }
+
+def main():
+    print("📂 Loading classifier + scaler...")
+    model  = pickle.load(open("models/classifier.pkl", "rb"))
+    scaler = pickle.load(open("models/scaler.pkl",     "rb"))
+
+    t0 = time.time()
+    with open(RAW_MODEL_PATH, "wb") as f:
+        f.write(fold_scaler(model, scaler))
+    raw_model = XGBClassifier()
+    raw_model.load_model(RAW_MODEL_PATH)
+    print(f"✅ Saved: {RAW_MODEL_PATH} ({round(time.time() - t0, 1)}s)")
+
+    print("\n🔍 Parity vs scaled path on X_test.npy...")
+    p = check_parity(model, raw_model, scaler, np.load("models/X_test.npy"))
+    print(f"   Rows            : {p['rows']:,}")
+    print(f"   Leaf agreement  : {p['leaf_agree']:.4f}%")
+    print(f"   Label agreement : {p['label_agree']:.4f}%")
+    print(f"   Max |Δ proba|   : {p['max_proba_diff']:.2e}")
+    print(f"   float64 inputs  : {p['leaf_agree_f64']:.4f}% leaves, {p['label_agree_f64']:.4f}% labels "
+          f"(exact only for float32 inputs)")
+    print("🚀 Use it with: SecureInferPipeline(raw_features=True)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import numpy as np, json
+
+class CompiledForest:
+    """
+    Array-backed XGBoost gbtree ensemble for CPU inference.
+
+    All trees live in one flat node table (feature, threshold, left, right,
+    default_left, value). Leaves point to themselves, so a batch is routed
+    level by level with a handful of vectorized gathers — no per-row Python.
+    """
+    CHUNK_CELLS = 1 << 22       # rows × trees routed at once → bounds scratch memory
+
+    def __init__(self, feature, threshold, left, right, default_left, value,
+                 roots, tree_class, base_margin, max_depth, objective):
+        self.feature      = feature
+        self.threshold    = threshold
+        self.left         = left
+        self.right        = right
+        self.default_left = default_left
+        self.value        = value
+        self.roots        = roots
+        self.tree_class   = tree_class
+        self.base_margin  = base_margin
+        self.max_depth    = max_depth
+        self.objective    = objective
+        self.n_classes    = len(base_margin)
+        # tree → class one-hot: leaf sums per class become one matmul
+        self._onehot = np.zeros((len(roots), self.n_classes), dtype=np.float32)
+        self._onehot[np.arange(len(roots)), tree_class] = 1.0
+        # children[2n] = left, children[2n + 1] = right → one gather per level
+        self._children = np.stack([left, right], axis=1).ravel()
+
+    @classmethod
+    def from_booster(cls, booster) -> "CompiledForest":
+        model   = json.loads(booster.save_raw("json"))["learner"]
+        gbtree  = model["gradient_booster"]
+        if gbtree["name"] != "gbtree":
+            raise ValueError(f"Only gbtree boosters can be compiled, got {gbtree['name']}")
+        trees   = gbtree["model"]["trees"]
+        n_class = max(int(model["learner_model_param"]["num_class"]), 1)
+
+        base = model["learner_model_param"]["base_score"].strip("[]")
+        base = np.array([float(b) for b in base.split(",")], dtype=np.float32)
+        if len(base) == 1:
+            base = np.repeat(base, n_class)
+        if model["objective"]["name"] == "binary:logistic":
+            base = np.log(base / (1.0 - base)).astype(np.float32)   # stored as a probability
+
+        sizes   = np.array([len(t["left_children"]) for t in trees])
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        cat     = lambda key, dtype: np.concatenate([np.asarray(t[key], dtype=dtype) for t in trees])
+
+        left    = cat("left_children", np.int64)
+        right   = cat("right_children", np.int64)
+        is_leaf = left == -1
+        owner   = np.repeat(offsets, sizes)
+        node_id = np.arange(len(left))
+        left    = np.where(is_leaf, node_id, left + owner).astype(np.int32)
+        right   = np.where(is_leaf, node_id, right + owner).astype(np.int32)
+        conds   = cat("split_conditions", np.float32)
+
+        return cls(
+            feature      = np.where(is_leaf, 0, cat("split_indices", np.int64)).astype(np.int32),
+            threshold    = np.where(is_leaf, np.float32(np.inf), conds).astype(np.float32),
+            left         = left,
+            right        = right,
+            default_left = cat("default_left", np.int8).astype(bool),
+            value        = np.where(is_leaf, conds, 0).astype(np.float32),
+            roots        = offsets.astype(np.int32),
+            tree_class   = np.asarray(gbtree["model"]["tree_info"], dtype=np.int64),
+            base_margin  = base,
+            max_depth    = max(cls._depth(t) for t in trees),
+            objective    = model["objective"]["name"],
+        )
+
+    ARRAYS = ("feature", "threshold", "left", "right", "default_left", "value",
+              "roots", "tree_class", "base_margin")
+
+    def to_arrays(self, prefix: str = "forest_") -> dict:
+        """Flat node table as plain arrays → np.savez, reloads without xgboost."""
+        arrays = {prefix + name: getattr(self, name) for name in self.ARRAYS}
+        arrays[prefix + "max_depth"] = np.int64(self.max_depth)
+        arrays[prefix + "objective"] = np.str_(self.objective)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix: str = "forest_") -> "CompiledForest":
+        return cls(**{name: arrays[prefix + name] for name in cls.ARRAYS},
+                   max_depth=int(arrays[prefix + "max_depth"]),
+                   objective=str(arrays[prefix + "objective"]))
+
+    @staticmethod
+    def _depth(tree) -> int:
+        left, right = tree["left_children"], tree["right_children"]
+        depth, frontier = 0, [0]
+        while True:
+            frontier = [c for n in frontier if left[n] != -1 for c in (left[n], right[n])]
+            if not frontier:
+                return depth
+            depth += 1
+
+    def _route(self, X: np.ndarray) -> np.ndarray:
+        n, n_features = X.shape
+        node = np.broadcast_to(self.roots, (n, len(self.roots))).copy()
+        flat = X.ravel()
+        base = (np.arange(n, dtype=np.int64) * n_features)[:, None]
+        nans = np.isnan(flat).any()
+        for _ in range(self.max_depth):
+            x        = flat[base + self.feature[node]]
+            go_right = ~(x < self.threshold[node])
+            if nans:
+                go_right &= ~(np.isnan(x) & self.default_left[node])
+            node = self._children[2 * node + go_right]
+        return node
+
+    def predict_margin(self, X) -> np.ndarray:
+        X   = np.ascontiguousarray(X, dtype=np.float32)
+        out = np.empty((len(X), self.n_classes), dtype=np.float32)
+        step = max(1, self.CHUNK_CELLS // len(self.roots))
+        for i in range(0, len(X), step):
+            leaves = self.value[self._route(X[i:i + step])]
+            out[i:i + step] = leaves @ self._onehot
+        return out + self.base_margin
+
+    def predict_proba(self, X) -> np.ndarray:
+        margin = self.predict_margin(X)
+        if self.objective == "binary:logistic":
+            p = 1.0 / (1.0 + np.exp(-margin[:, 0]))
+            return np.column_stack([1.0 - p, p])
+        margin -= margin.max(axis=1, keepdims=True)
+        np.exp(margin, out=margin)
+        return margin / margin.sum(axis=1, keepdims=True)
+
+    def predict(self, X) -> np.ndarray:
+        return self.predict_proba(X).argmax(axis=1)
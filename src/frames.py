@@ -0,0 +1,73 @@
+"""
+Columnar wire formats for bulk scoring (POST /analyze/frame).
+
+Raw frame (Content-Type: application/x-secureinfer-frame):
+
+    b"SIF1" | uint32 LE header length | JSON header, space-padded to 4 bytes | float32 LE body
+    header = {"columns": [...], "rows": N, ...}  body = N × len(columns) row-major
+
+The body is decoded with np.frombuffer → a view on the request bytes, no copy.
+
+Arrow IPC stream (Content-Type: application/vnd.apache.arrow.stream): one
+numeric column per feature; needs pyarrow.
+"""
+import json, struct
+import numpy as np
+
+MAGIC        = b"SIF1"
+FRAME_TYPE   = "application/x-secureinfer-frame"
+ARROW_TYPE   = "application/vnd.apache.arrow.stream"
+
+def encode_frame(columns: list, X: np.ndarray, **meta) -> bytes:
+    X = np.ascontiguousarray(X, dtype="<f4")
+    if X.ndim != 2 or X.shape[1] != len(columns):
+        raise ValueError(f"Matrix shape {X.shape} does not match {len(columns)} columns")
+    header  = json.dumps({"columns": list(columns), "rows": len(X), **meta}).encode()
+    header += b" " * (-len(header) % 4)         # keep the float32 body 4-byte aligned
+    return MAGIC + struct.pack("<I", len(header)) + header + X.tobytes()
+
+def decode_frame(body: bytes):
+    """→ (header dict, N×C float32 view on body)."""
+    if len(body) < 8 or body[:4] != MAGIC:
+        raise ValueError("Not a SIF1 frame")
+    (size,) = struct.unpack_from("<I", body, 4)
+    header  = json.loads(body[8:8 + size])
+    # Malformed, not missing features: the server answers 400 for ValueError, 422 for KeyError
+    if not isinstance(header, dict) or not isinstance(header.get("columns"), list) or "rows" not in header:
+        raise ValueError('SIF1 header must be an object with "columns" (list) and "rows"')
+    columns, rows = header["columns"], int(header["rows"])
+    if rows < 0:
+        raise ValueError(f"Negative row count {rows}")
+    offset  = 8 + size
+    if len(body) - offset != rows * len(columns) * 4:
+        raise ValueError(f"Body is {len(body) - offset} bytes, header promises "
+                         f"{rows} × {len(columns)} float32")
+    X = np.frombuffer(body, dtype="<f4", count=rows * len(columns), offset=offset)
+    return header, X.reshape(rows, len(columns))
+
+def decode_arrow(body: bytes):
+    """→ (column names, N×C float32 matrix). One copy: columnar → row-major."""
+    import pyarrow as pa
+    table = pa.ipc.open_stream(body).read_all()
+    X     = np.empty((table.num_rows, table.num_columns), dtype=np.float32)
+    for j, col in enumerate(table.columns):
+        X[:, j] = col.to_numpy()
+    return table.column_names, X
+
+def encode_arrow(columns: dict) -> bytes:
+    import pyarrow as pa
+    batch = pa.RecordBatch.from_pydict(columns)
+    sink  = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+def select_features(columns: list, X: np.ndarray, feature_cols: list) -> np.ndarray:
+    """Reorder to the model's feature order; a view when the order already matches."""
+    if list(columns) == list(feature_cols):
+        return X
+    index   = {c: j for j, c in enumerate(columns)}
+    missing = [c for c in feature_cols if c not in index]
+    if missing:
+        raise KeyError(missing)
+    return X[:, [index[c] for c in feature_cols]]
@@ -0,0 +1,155 @@
+"""
+Continue boosting models/classifier.pkl on new CICIDS CSVs only.
+
+    python3 src/incremental_update.py data/new/*.csv [--rounds 50] [--compare]
+
+The scaler the existing trees were trained against stays frozen (changing it
+would silently move every split); its drift on the new data is measured with
+StandardScaler.partial_fit and logged. Each increment appends a lineage
+record to models/lineage.jsonl and keeps the previous classifier under
+models/history/.
+"""
+import numpy as np, pandas as pd, pickle, json, time, os, sys, copy, hashlib, argparse, shutil
+import xgboost as xgb
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.data_prep import _load_file
+from src.train_classifier import make_model, load_split, predict_in_batches, GATE_PATH
+from src.model_bundle import BUNDLE_NAME
+
+LINEAGE_PATH = "models/lineage.jsonl"
+HISTORY_DIR  = "models/history"
+
+def sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()[:16]
+
+def load_new(csv_files: list, feature_cols: list, le):
+    columns = []
+    for f in csv_files:
+        for c in pd.read_csv(f, nrows=0, encoding='utf-8').columns.str.strip():
+            if c not in columns:
+                columns.append(c)
+    missing = [c for c in feature_cols if c not in columns]
+    if missing:
+        raise ValueError(f"New CSVs lack model features: {missing}")
+
+    parts  = [_load_file(f, columns, feature_cols) for f in sorted(csv_files)]
+    X      = np.concatenate([p[0] for p in parts])
+    labels = np.concatenate([p[1] for p in parts])
+    # num_class is fixed by the existing model → unseen labels cannot be learned here
+    known  = np.isin(labels, le.classes_)
+    if not known.all():
+        unseen = sorted({str(l) for l in labels[~known]})
+        print(f"⚠️  Dropping {int((~known).sum()):,} rows with unseen labels {unseen} — needs a full retrain")
+    return X[known], le.transform(labels[known])
+
+def scaler_drift(scaler, X_new) -> float:
+    """Largest shift of any feature mean after folding in the new rows, in old std units."""
+    running = copy.deepcopy(scaler)
+    running.partial_fit(pd.DataFrame(X_new, columns=scaler.feature_names_in_)
+                        if hasattr(scaler, "feature_names_in_") else X_new)
+    return float(np.max(np.abs(running.mean_ - scaler.mean_) / scaler.scale_))
+
+def continue_boosting(model, X, y, rounds: int, n_classes: int):
+    # xgb.train directly: XGBClassifier.fit refuses batches that miss a class
+    params = model.get_xgb_params()
+    params.update(objective="multi:softprob", num_class=n_classes)
+    booster = xgb.train(params, xgb.DMatrix(X, label=y), num_boost_round=rounds,
+                        xgb_model=model.get_booster())
+    model.load_model(bytearray(booster.save_raw("json")))
+    return model
+
+def main():
+    ap = argparse.ArgumentParser(description="Incremental SecureInfer classifier update")
+    ap.add_argument("csv", nargs="+", help="new CSV files only")
+    ap.add_argument("--rounds", type=int, default=50, help="boosting rounds to add")
+    ap.add_argument("--compare", action="store_true",
+                    help="also run a full retrain on old train split + new data and compare")
+    args = ap.parse_args()
+
+    model        = pickle.load(open("models/classifier.pkl",    "rb"))
+    le           = pickle.load(open("models/label_encoder.pkl", "rb"))
+    scaler       = pickle.load(open("models/scaler.pkl",        "rb"))
+    feature_cols = pickle.load(open("models/feature_cols.pkl",  "rb"))
+    n_classes    = len(le.classes_)
+
+    print(f"📂 Loading {len(args.csv)} new file(s)...")
+    X_raw, y = load_new(args.csv, feature_cols, le)
+    X_new    = scaler.transform(pd.DataFrame(X_raw, columns=feature_cols)).astype(np.float32)
+    drift    = scaler_drift(scaler, X_raw)
+    print(f"✅ {len(X_new):,} new rows | scaler drift {drift:.3f} σ (scaler kept frozen)")
+
+    # Hold out 20% of the increment to score it alongside the original test split
+    stratify = y if np.unique(y, return_counts=True)[1].min(initial=2) >= 2 else None
+    X_fit, X_hold, y_fit, y_hold = train_test_split(X_new, y, test_size=0.2,
+                                                    random_state=42, stratify=stratify)
+    X_test, y_test = load_split("test")
+
+    parent = sha256("models/classifier.pkl")
+    t0     = time.time()
+    continue_boosting(model, X_fit, y_fit, args.rounds, n_classes)
+    wall   = round(time.time() - t0, 1)
+
+    increment = 1
+    if os.path.exists(LINEAGE_PATH):
+        with open(LINEAGE_PATH) as f:
+            increment += sum(1 for _ in f)
+    record = {
+        "increment":     increment,
+        "time":          time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "files":         [os.path.basename(f) for f in args.csv],
+        "rows":          int(len(X_fit)),
+        "rounds":        args.rounds,
+        "total_rounds":  model.get_booster().num_boosted_rounds(),
+        "wall_s":        wall,
+        "acc_test":      round(accuracy_score(y_test, predict_in_batches(model, X_test)) * 100, 3),
+        "acc_new":       round(accuracy_score(y_hold, model.predict(X_hold)) * 100, 3),
+        "scaler_drift":  round(drift, 4),
+        "parent_sha256": parent,
+    }
+
+    os.makedirs(HISTORY_DIR, exist_ok=True)
+    shutil.copy("models/classifier.pkl", f"{HISTORY_DIR}/classifier.{parent}.pkl")
+    pickle.dump(model, open("models/classifier.pkl", "wb"))
+    record["sha256"] = sha256("models/classifier.pkl")
+
+    if args.compare:
+        print("\n⚖️  Full retrain for comparison (old train split + new rows)...")
+        X_train, y_train = load_split("train")
+        full = make_model()
+        t0   = time.time()
+        full.fit(np.concatenate([X_train, X_fit]), np.concatenate([y_train, y_fit]))
+        record["full_retrain"] = {
+            "wall_s":   round(time.time() - t0, 1),
+            "acc_test": round(accuracy_score(y_test, predict_in_batches(full, X_test)) * 100, 3),
+            "acc_new":  round(accuracy_score(y_hold, full.predict(X_hold)) * 100, 3),
+        }
+
+    with open(LINEAGE_PATH, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+    print(f"\n⏱️  Increment time : {wall}s  (+{args.rounds} rounds → {record['total_rounds']})")
+    print(f"🎯 Accuracy      : test {record['acc_test']:.2f}% | new hold-out {record['acc_new']:.2f}%")
+    if args.compare:
+        full = record["full_retrain"]
+        print(f"⚖️  Full retrain  : {full['wall_s']}s | test {full['acc_test']:.2f}% | new {full['acc_new']:.2f}%")
+    print(f"✅ Saved: models/classifier.pkl (parent {parent} → {record['sha256']})")
+    print(f"📜 Lineage: {LINEAGE_PATH}")
+    print("🚀 Serve it without a restart: python3 src/model_registry.py publish")
+    # Everything derived from the old classifier is stale now; the bundle last, it packs the others
+    if os.path.exists("models/classifier_raw.json"):
+        print("⚠️  Re-run python3 src/export_raw_model.py — the raw-feature model is now stale")
+    if os.path.exists(GATE_PATH):
+        print("⚠️  Re-run python3 src/train_classifier.py --gate-only — the gate threshold was tuned "
+              "to the old classifier")
+    if os.path.exists(os.path.join("models", BUNDLE_NAME)):
+        print(f"⚠️  Re-run python3 src/model_bundle.py — models/{BUNDLE_NAME} is stale "
+              "(the pickles are loaded until then)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Fixed-memory latency histograms and counters, rendered in the Prometheus
+text format (GET /metrics).
+
+Histograms are HDR-style log-linear: a value in ns lands in one of 16
+linear sub-buckets of its power of two, so every latency is kept to
+within 6.25 % from 1 ns to ~2 min in 560 counters per stage, however much
+traffic goes through. All counters sit in arrays with one row per worker:
+Metrics(slots=N, shared=True) maps them into anonymous shared memory, so
+after api/serve.py forks each worker writes its own row and /metrics from
+any worker sums them all.
+"""
+import mmap, threading, time
+import numpy as np
+
+SUB_BITS  = 4
+SUB       = 1 << SUB_BITS
+MAX_EXP   = 37                                  # 2^37 ns ≈ 137 s; slower values clamp to the top bucket
+N_BUCKETS = (MAX_EXP - SUB_BITS + 2) * SUB
+
+STAGES = (
+    "vectorize", "cache_lookup", "scale", "gate", "predict", "decode", "total",       # one flow
+    "batch_vectorize", "batch_cache_lookup", "batch_scale", "batch_gate",             # one batch
+    "batch_predict", "batch_decode",
+    "llm_request", "llm_parse", "llm_fallback",
+)
+LLM_OUTCOMES = ("parsed", "regex_recovered", "fallback", "cached")
+EXPORT_LE    = [m * 10.0 ** e for e in range(-6, 2) for m in (1, 2.5, 5)] + [100.0]   # seconds
+
+def bucket_index(ns: int) -> int:
+    if ns < SUB:
+        return max(int(ns), 0)
+    e = int(ns).bit_length() - 1
+    if e > MAX_EXP:
+        return N_BUCKETS - 1
+    return (e - SUB_BITS + 1) * SUB + (int(ns) >> (e - SUB_BITS)) - SUB
+
+def bucket_upper() -> np.ndarray:
+    """Exclusive upper bound in ns of every bucket."""
+    i     = np.arange(N_BUCKETS, dtype=np.int64)
+    block = i // SUB
+    return np.where(block == 0, i + 1, (SUB + i % SUB + 1) << np.maximum(block - 1, 0))
+
+_UPPER = bucket_upper()
+
+def quantile_ns(counts: np.ndarray, q: float) -> float:
+    """Upper bound of the bucket holding the q-quantile (≤ 6.25 % high), 0 if empty."""
+    total = counts.sum()
+    if total == 0:
+        return 0.0
+    return float(_UPPER[np.searchsorted(np.cumsum(counts), q * total)])
+
+def _array(shape: tuple, shared: bool) -> np.ndarray:
+    if not shared:
+        return np.zeros(shape, dtype=np.int64)
+    # MAP_SHARED | MAP_ANONYMOUS, zero-filled, inherited by forked workers
+    buf = mmap.mmap(-1, int(np.prod(shape)) * 8)
+    return np.frombuffer(buf, dtype=np.int64).reshape(shape)
+
+class Histogram:
+    """A single fixed-memory latency histogram (app.py's dashboard stats)."""
+    def __init__(self):
+        self.counts   = np.zeros(N_BUCKETS, dtype=np.int64)
+        self.total_ns = 0
+
+    def record_ns(self, ns: int):
+        self.counts[bucket_index(ns)] += 1
+        self.total_ns += int(ns)
+
+    def record_ms(self, ms: float):
+        self.record_ns(int(ms * 1e6))
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def mean_ms(self) -> float:
+        return self.total_ns / self.count / 1e6 if self.count else 0.0
+
+    def quantile_ms(self, q: float) -> float:
+        return quantile_ns(self.counts, q) / 1e6
+
+class Stopwatch:
+    """Monotonic laps for one request; done() records them all under one lock."""
+    __slots__ = ("metrics", "t", "laps")
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.laps    = []
+        self.t       = time.perf_counter_ns()
+
+    def lap(self, stage: str):
+        now = time.perf_counter_ns()
+        self.laps.append((stage, now - self.t))
+        self.t = now
+
+    def done(self):
+        self.metrics.observe_many(self.laps)
+        self.laps = []
+
+class Metrics:
+    """Per-stage histograms + per-class and per-LLM-outcome counters."""
+    def __init__(self, classes=(), slots: int = 1, shared: bool = False):
+        self.classes   = [str(c) for c in classes] + ["other"]
+        self.slot      = 0              # api/serve.py: the worker's row
+        self.slots     = slots
+        self._stage_ix = {s: i for i, s in enumerate(STAGES)}
+        self._class_ix = {c: i for i, c in enumerate(self.classes)}
+        self._lock     = threading.Lock()
+        self.hist      = _array((slots, len(STAGES), N_BUCKETS), shared)
+        self.sum_ns    = _array((slots, len(STAGES)), shared)
+        self.predicted = _array((slots, len(self.classes)), shared)
+        self.outcomes  = _array((slots, len(LLM_OUTCOMES)), shared)
+        # Flat int64 views of the same memory: a memoryview item += is several
+        # times cheaper than indexing a numpy array with a scalar tuple
+        self._hist, self._sum_ns, self._predicted, self._outcomes = (
+            memoryview(a.reshape(-1)).cast("B").cast("q")
+            for a in (self.hist, self.sum_ns, self.predicted, self.outcomes))
+
+    def stopwatch(self) -> Stopwatch:
+        return Stopwatch(self)
+
+    def observe(self, stage: str, ns: int):
+        self.observe_many(((stage, ns),))
+
+    def observe_many(self, laps):
+        row = self.slot * len(STAGES)
+        with self._lock:
+            for stage, ns in laps:
+                s = row + self._stage_ix[stage]
+                self._hist[s * N_BUCKETS + bucket_index(ns)] += 1
+                self._sum_ns[s] += ns
+
+    def count_class(self, attack_type: str, n: int = 1):
+        i = self._class_ix.get(str(attack_type), len(self.classes) - 1)
+        with self._lock:
+            self._predicted[self.slot * len(self.classes) + i] += n
+
+    def count_classes(self, classes, pred_enc: np.ndarray):
+        """Batch form: one bincount, then a counter bump per class present."""
+        for k, n in enumerate(np.bincount(pred_enc, minlength=len(classes)).tolist()):
+            if n:
+                self.count_class(classes[k], n)
+
+    def count_outcome(self, outcome: str, n: int = 1):
+        with self._lock:
+            self._outcomes[self.slot * len(LLM_OUTCOMES) + LLM_OUTCOMES.index(outcome)] += n
+
+    def reset(self):
+        """Zero every counter in place (shared rows included) — benchmarks, after warm-up."""
+        with self._lock:
+            for a in (self.hist, self.sum_ns, self.predicted, self.outcomes):
+                a[...] = 0
+
+    def summary(self) -> dict:
+        """Stage → count, mean and p50/p95/p99 in ms, for stages that saw traffic."""
+        hist, sums = self.hist.sum(axis=0), self.sum_ns.sum(axis=0)
+        out = {}
+        for i, stage in enumerate(STAGES):
+            count = int(hist[i].sum())
+            if count:
+                out[stage] = {"count": count, "mean_ms": round(float(sums[i]) / count / 1e6, 4),
+                              **{f"p{q}_ms": round(quantile_ns(hist[i], q / 100) / 1e6, 4)
+                                 for q in (50, 95, 99)}}
+        return out
+
+    def render(self) -> str:
+        hist, sums = self.hist.sum(axis=0), self.sum_ns.sum(axis=0)
+        predicted, outcomes = self.predicted.sum(axis=0), self.outcomes.sum(axis=0)
+        # Prometheus buckets count values ≤ le: take the HDR buckets that end at or below it
+        upto  = np.searchsorted(_UPPER, np.asarray(EXPORT_LE) * 1e9, side="right") - 1
+        lines = ["# HELP secureinfer_stage_seconds Latency of each pipeline stage (monotonic clock)",
+                 "# TYPE secureinfer_stage_seconds histogram"]
+        for i, stage in enumerate(STAGES):
+            cum = np.cumsum(hist[i])
+            for le, j in zip(EXPORT_LE, upto):
+                lines.append(f'secureinfer_stage_seconds_bucket{{stage="{stage}",le="{le:g}"}} '
+                             f'{int(cum[j]) if j >= 0 else 0}')
+            lines.append(f'secureinfer_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {int(cum[-1])}')
+            lines.append(f'secureinfer_stage_seconds_sum{{stage="{stage}"}} {sums[i] / 1e9:.9f}')
+            lines.append(f'secureinfer_stage_seconds_count{{stage="{stage}"}} {int(cum[-1])}')
+        lines += ["# HELP secureinfer_predictions_total Flows classified, by predicted class",
+                  "# TYPE secureinfer_predictions_total counter"]
+        lines += [f'secureinfer_predictions_total{{attack_type="{c}"}} {int(n)}'
+                  for c, n in zip(self.classes, predicted)]
+        lines += ["# HELP secureinfer_llm_outcomes_total LLM briefings by how the answer was obtained",
+                  "# TYPE secureinfer_llm_outcomes_total counter"]
+        lines += [f'secureinfer_llm_outcomes_total{{outcome="{o}"}} {int(n)}'
+                  for o, n in zip(LLM_OUTCOMES, outcomes)]
+        return "\n".join(lines) + "\n"
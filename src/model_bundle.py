@@ -0,0 +1,127 @@
+"""
+Single-file model bundle: models/model.npz
+
+    booster          native XGBoost UBJSON bytes (uint8)
+    forest_*         the same trees as CompiledForest arrays → serve without xgboost
+    mean, scale      StandardScaler statistics (float64)
+    classes          LabelEncoder classes
+    feature_cols     feature order
+    raw_booster,     optional scaler-folded model (src/export_raw_model.py)
+    raw_forest_*
+    gate_forest_*,   optional cascade gate (train_classifier.py --gate) as
+    gate_threshold,  CompiledForest arrays + early-exit threshold
+    gate_benign
+
+Loaded with allow_pickle=False: no sklearn, pandas or unpickling at startup.
+
+    python3 src/model_bundle.py            # models/*.pkl → models/model.npz
+"""
+import numpy as np, os, sys, time, pickle, tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.forest import CompiledForest
+
+BUNDLE_NAME   = "model.npz"
+BUNDLE_FORMAT = 1
+
+class BundleScaler:
+    """StandardScaler stand-in: same float64 arithmetic, numpy only."""
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        self.mean_, self.scale_ = mean, scale
+        self.n_features_in_     = len(mean)
+
+    def transform(self, X) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+    def inverse_transform(self, X) -> np.ndarray:
+        return np.asarray(X, dtype=np.float64) * self.scale_ + self.mean_
+
+class BundleEncoder:
+    """LabelEncoder stand-in for decoding class indices."""
+    def __init__(self, classes: np.ndarray):
+        self.classes_ = classes
+
+    def inverse_transform(self, y) -> np.ndarray:
+        return self.classes_[np.asarray(y, dtype=np.int64)]
+
+def _ubj(classifier) -> np.ndarray:
+    # save_model (not save_raw) keeps the sklearn wrapper attributes with the trees
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.ubj")
+        classifier.save_model(path)
+        return np.fromfile(path, dtype=np.uint8)
+
+def save_bundle(path: str, classifier, le, scaler, feature_cols, raw_classifier=None, gate=None):
+    n_features = len(feature_cols)
+    arrays = {
+        "format":       np.int64(BUNDLE_FORMAT),
+        "created":      np.str_(time.strftime("%Y-%m-%dT%H:%M:%S")),
+        "booster":      _ubj(classifier),
+        "mean":         np.zeros(n_features) if scaler.mean_  is None else np.asarray(scaler.mean_,  dtype=np.float64),
+        "scale":        np.ones(n_features)  if scaler.scale_ is None else np.asarray(scaler.scale_, dtype=np.float64),
+        "classes":      np.asarray([str(c) for c in le.classes_]),
+        "feature_cols": np.asarray(list(feature_cols)),
+        **CompiledForest.from_booster(classifier.get_booster()).to_arrays("forest_"),
+    }
+    if raw_classifier is not None:
+        arrays["raw_booster"] = _ubj(raw_classifier)
+        arrays.update(CompiledForest.from_booster(raw_classifier.get_booster()).to_arrays("raw_forest_"))
+    if gate is not None:
+        arrays.update(CompiledForest.from_booster(gate["model"].get_booster()).to_arrays("gate_forest_"))
+        arrays["gate_threshold"] = np.float64(gate["threshold"])
+        arrays["gate_benign"]    = np.int64(gate["benign"])
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, **arrays)      # uncompressed → load is a straight read
+    os.replace(tmp, path)
+
+def load_bundle(path: str) -> dict:
+    with np.load(path, allow_pickle=False) as npz:
+        bundle = {k: npz[k] for k in npz.files}
+    if int(bundle["format"]) != BUNDLE_FORMAT:
+        raise ValueError(f"{path}: bundle format {int(bundle['format'])}, expected {BUNDLE_FORMAT}")
+    return bundle
+
+def load_classifier(raw: np.ndarray):
+    """UBJSON bytes → XGBClassifier (imports xgboost, so only when the booster path is used)."""
+    from xgboost import XGBClassifier
+    classifier = XGBClassifier()
+    classifier.load_model(bytearray(raw.tobytes()))
+    return classifier
+
+def bundle_dir(model_dir: str = "models") -> str:
+    """Build <model_dir>/model.npz from the pickles (and classifier_raw.json) next to it."""
+    from src.export_raw_model import RAW_MODEL_PATH
+    classifier   = pickle.load(open(os.path.join(model_dir, "classifier.pkl"),    "rb"))
+    le           = pickle.load(open(os.path.join(model_dir, "label_encoder.pkl"), "rb"))
+    scaler       = pickle.load(open(os.path.join(model_dir, "scaler.pkl"),        "rb"))
+    feature_cols = pickle.load(open(os.path.join(model_dir, "feature_cols.pkl"),  "rb"))
+    raw_path     = os.path.join(model_dir, os.path.basename(RAW_MODEL_PATH))
+    raw          = load_classifier(np.fromfile(raw_path, dtype=np.uint8)) if os.path.exists(raw_path) else None
+    gate_path    = os.path.join(model_dir, "gate.pkl")
+    gate         = pickle.load(open(gate_path, "rb")) if os.path.exists(gate_path) else None
+
+    path = os.path.join(model_dir, BUNDLE_NAME)
+    save_bundle(path, classifier, le, scaler, feature_cols, raw, gate)
+    return path
+
+# Everything bundle_dir() reads: a newer copy of any of them makes model.npz stale
+SOURCE_FILES = ("classifier.pkl", "label_encoder.pkl", "scaler.pkl", "feature_cols.pkl",
+                "classifier_raw.json", "gate.pkl")
+
+def is_fresh(model_dir: str) -> bool:
+    """True if model.npz exists and is not older than any artifact it was built from."""
+    path    = os.path.join(model_dir, BUNDLE_NAME)
+    sources = [p for p in (os.path.join(model_dir, name) for name in SOURCE_FILES) if os.path.exists(p)]
+    return os.path.exists(path) and all(os.path.getmtime(path) >= os.path.getmtime(p) for p in sources)
+
+def main():
+    t0   = time.time()
+    path = bundle_dir("models")
+    bundle = load_bundle(path)
+    extras = [name for key, name in (("raw_booster", "raw-feature model"), ("gate_threshold", "cascade gate"))
+              if key in bundle]
+    print(f"✅ Saved: {path} ({os.path.getsize(path) / 1e6:.1f} MB"
+          f"{', with ' + ' + '.join(extras) if extras else ''}, {round(time.time() - t0, 1)}s)")
+    print("🚀 SecureInferPipeline now loads it instead of the pickles")
+
+if __name__ == "__main__":
+    main()
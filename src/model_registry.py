@@ -0,0 +1,120 @@
+"""
+Versioned model registry: models/registry/<version>/ holds one complete
+classifier / label_encoder / scaler / feature_cols set plus its model.npz
+bundle (src/model_bundle.py), CURRENT names the live one.
+
+    python3 src/model_registry.py publish [--version NAME]   # snapshot models/*.pkl
+    python3 src/model_registry.py activate NAME              # roll forward / back
+    python3 src/model_registry.py list
+
+A running API server polls CURRENT (ModelWatcher) or reloads on POST /admin/reload.
+"""
+import os, sys, time, shutil, threading, argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+REGISTRY_DIR   = "models/registry"
+MODEL_FILES    = ("classifier.pkl", "label_encoder.pkl", "scaler.pkl", "feature_cols.pkl")
+OPTIONAL_FILES = ("classifier_raw.json", "gate.pkl")
+
+def versions(root: str = REGISTRY_DIR) -> list:
+    if not os.path.isdir(root):
+        return []
+    return sorted(v for v in os.listdir(root)
+                  if not v.startswith(".") and os.path.isdir(os.path.join(root, v)))
+
+def current(root: str = REGISTRY_DIR):
+    path = os.path.join(root, "CURRENT")
+    if not os.path.exists(path):
+        return None
+    return open(path).read().strip() or None
+
+def resolve(root: str = REGISTRY_DIR):
+    """(version, directory) to load: the registry's CURRENT, else the flat models/ dir."""
+    version = current(root)
+    if version is None:
+        return "unversioned", os.path.dirname(root) or "."
+    return version, os.path.join(root, version)
+
+def activate(version: str, root: str = REGISTRY_DIR):
+    missing = [f for f in MODEL_FILES if not os.path.exists(os.path.join(root, version, f))]
+    if missing:
+        raise FileNotFoundError(f"Version {version!r} is incomplete, missing {missing}")
+    # Rename is atomic → a poller never reads a half-written pointer
+    tmp = os.path.join(root, ".CURRENT.tmp")
+    with open(tmp, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp, os.path.join(root, "CURRENT"))
+
+def publish(src: str = "models", version: str = None, root: str = REGISTRY_DIR,
+            make_current: bool = True) -> str:
+    version = version or time.strftime("%Y%m%d-%H%M%S")
+    target  = os.path.join(root, version)
+    if os.path.exists(target):
+        raise FileExistsError(f"Version {version!r} already exists in {root}")
+    # Stage under a hidden name, then rename → the version dir appears complete or not at all
+    staging = os.path.join(root, f".staging-{version}")
+    os.makedirs(staging, exist_ok=True)
+    for name in MODEL_FILES + OPTIONAL_FILES:
+        path = os.path.join(src, name)
+        if os.path.exists(path):
+            shutil.copy2(path, staging)
+        elif name in MODEL_FILES:
+            shutil.rmtree(staging)
+            raise FileNotFoundError(f"{path} not found — train first")
+    # Fresh single-file bundle from exactly these pickles → fast cold start
+    from src.model_bundle import bundle_dir
+    bundle_dir(staging)
+    os.rename(staging, target)
+    if make_current:
+        activate(version, root)
+    return version
+
+class ModelWatcher:
+    """Background poller: when CURRENT changes, pipeline.reload() loads, validates and swaps."""
+    def __init__(self, pipeline, poll_s: float = 5.0):
+        self.pipeline = pipeline
+        self.poll_s   = poll_s
+        self.failed   = None     # version that failed validation → not retried every poll
+        self._stop    = threading.Event()
+        self._thread  = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.poll_s):
+            version = current(self.pipeline.registry)
+            if version is None or version in (self.pipeline.models.version, self.failed):
+                continue
+            try:
+                result = self.pipeline.reload()
+                print(f"🔄 Model {result['previous_version']} → {result['version']} ({result['load_ms']} ms)")
+            except Exception as e:
+                self.failed = version
+                print(f"⚠️  Model {version} rejected, keeping {self.pipeline.models.version}: {e}")
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=self.poll_s + 1)
+
+def main():
+    ap  = argparse.ArgumentParser(description="SecureInfer model registry")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p   = sub.add_parser("publish", help="snapshot models/*.pkl as a new version")
+    p.add_argument("--version", help="version name (default: timestamp)")
+    p.add_argument("--no-activate", action="store_true", help="publish without switching CURRENT")
+    sub.add_parser("activate", help="point CURRENT at an existing version").add_argument("version")
+    sub.add_parser("list", help="list versions")
+    args = ap.parse_args()
+
+    if args.cmd == "publish":
+        version = publish(version=args.version, make_current=not args.no_activate)
+        print(f"✅ Published {REGISTRY_DIR}/{version}" + ("" if args.no_activate else " (CURRENT)"))
+    elif args.cmd == "activate":
+        activate(args.version)
+        print(f"✅ CURRENT → {args.version}")
+    else:
+        live = current()
+        for v in versions():
+            print(f"{'*' if v == live else ' '} {v}")
+
+if __name__ == "__main__":
+    sys.exit(main())
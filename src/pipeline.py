@@ -1,7 +1,14 @@
-import pickle, numpy as np, time, sys, os
-import pandas as pd
+import pickle, numpy as np, time, sys, os, threading
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.explainer import ThreatExplainer
+from src.explain_cache import ExplanationCache
+from src.briefing_queue import BriefingQueue
+from src.briefing_policy import BriefingPolicy
+from src.prompt_batcher import PromptBatcher
+from src.forest import CompiledForest
+from src.prediction_cache import PredictionCache
+from src.metrics import Metrics
+from src import model_registry, model_bundle
 
 SEVERITY_MAP = {
     'BENIGN': 'SAFE',
@@ -16,53 +23,449 @@ SEVERITY_MAP = {
     'Web Attack - XSS':             'HIGH',
 }
 
+class ModelSet:
+    """One consistent classifier/encoder/scaler/feature_cols version plus its fast-path state."""
+    BULK_ROWS = 32      # from here XGBoost's C++ predictor beats the NumPy forest on CPU
+    def __init__(self, model_dir: str = "models", version: str = "unversioned",
+                 raw_features: bool = False, compiled: bool = False):
+        t0                 = time.perf_counter()
+        self.version       = version
+        self.model_dir     = model_dir
+        self.raw_features  = raw_features
+        self._nthread      = None
+        self._booster_raw  = None      # bundle UBJSON, loaded on demand for bulk batches
+        self._booster_job  = None
+        self._booster_lock = threading.Lock()
+        self.source       = "bundle" if model_bundle.is_fresh(model_dir) else "pickles"
+        if self.source == "bundle":
+            self._load_bundle(os.path.join(model_dir, model_bundle.BUNDLE_NAME), compiled)
+        else:
+            self._load_pickles(model_dir, compiled)
+        self.predict_proba = self.forest.predict_proba if compiled else self.classifier.predict_proba
+        if self.raw_features:
+            self.gate = None    # trained on scaled features; raw mode skips the scaler it needs
+        self._prepare_fast_path()
+        self.load_ms       = int((time.perf_counter() - t0) * 1000)
+        self.loaded_at     = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+    def _load_pickles(self, model_dir: str, compiled: bool):
+        self.classifier   = pickle.load(open(os.path.join(model_dir, "classifier.pkl"),    "rb"))
+        self.le           = pickle.load(open(os.path.join(model_dir, "label_encoder.pkl"), "rb"))
+        self.scaler       = pickle.load(open(os.path.join(model_dir, "scaler.pkl"),        "rb"))
+        self.feature_cols = pickle.load(open(os.path.join(model_dir, "feature_cols.pkl"),  "rb"))
+        if self.raw_features:
+            # Scaler folded into the split thresholds (src/export_raw_model.py): same leaves
+            # as the scaled path for float32 inputs, float64 ones may differ within an ulp
+            from xgboost import XGBClassifier
+            from src.export_raw_model import RAW_MODEL_PATH
+            self.classifier = XGBClassifier()
+            self.classifier.load_model(os.path.join(model_dir, os.path.basename(RAW_MODEL_PATH)))
+        # Optional CPU backend: flat node arrays evaluated with vectorized NumPy
+        self.forest = CompiledForest.from_booster(self.classifier.get_booster()) if compiled else None
+        # Optional cascade gate (train_classifier.py --gate): always the NumPy forest, it is tiny
+        self.gate, gate_path = None, os.path.join(model_dir, "gate.pkl")
+        if os.path.exists(gate_path):
+            gate = pickle.load(open(gate_path, "rb"))
+            self.gate = CompiledForest.from_booster(gate["model"].get_booster())
+            self.gate_threshold, self.gate_benign = float(gate["threshold"]), int(gate["benign"])
+
+    def _load_bundle(self, path: str, compiled: bool):
+        # One npz, no unpickling or sklearn; compiled=True never imports xgboost either
+        bundle = model_bundle.load_bundle(path)
+        prefix = "raw_" if self.raw_features else ""
+        if prefix + "booster" not in bundle:
+            raise FileNotFoundError(f"{path} has no raw-feature model — run src/export_raw_model.py, "
+                                    f"then src/model_bundle.py")
+        self.le           = model_bundle.BundleEncoder(bundle["classes"].astype(object))
+        self.scaler       = model_bundle.BundleScaler(bundle["mean"], bundle["scale"])
+        self.feature_cols = bundle["feature_cols"].tolist()
+        self.forest       = CompiledForest.from_arrays(bundle, prefix + "forest_") if compiled else None
+        self.classifier   = None if compiled else model_bundle.load_classifier(bundle[prefix + "booster"])
+        self._booster_raw = bundle[prefix + "booster"] if compiled else None
+        self.gate         = CompiledForest.from_arrays(bundle, "gate_forest_") if "gate_threshold" in bundle else None
+        if self.gate is not None:
+            self.gate_threshold = float(bundle["gate_threshold"])
+            self.gate_benign    = int(bundle["gate_benign"])
+
+    def _prepare_fast_path(self):
+        # Scaler stats as plain vectors + raw booster → no pandas/sklearn per request
+        n_features   = len(self.feature_cols)
+        mean         = getattr(self.scaler, "mean_", None)
+        scale        = getattr(self.scaler, "scale_", None)
+        self._mean   = np.zeros(n_features) if mean  is None else np.asarray(mean,  dtype=np.float64)
+        self._scale  = np.ones(n_features)  if scale is None else np.asarray(scale, dtype=np.float64)
+        # Single rows are latency-bound: a host→GPU copy costs more than the trees
+        self._booster = None
+        if self.classifier is not None:
+            self._booster = self.classifier.get_booster().copy()
+            self._booster.set_param({"device": "cpu"})
+        self._classes = self.le.classes_
+
+    def bulk_booster(self, wait: bool = False):
+        """
+        CPU booster for big batches, or None while it is not loaded yet. From a
+        bundle it is built in the background on first call (xgboost import ≈ 1 s),
+        and callers keep using the compiled forest until it is ready; wait=True
+        blocks until it is (api/serve.py, before fork).
+        """
+        if self._booster is not None or self._booster_raw is None:
+            return self._booster
+        with self._booster_lock:
+            if self._booster_job is None:
+                self._booster_job = threading.Thread(target=self._load_booster,
+                                                     name="bulk-booster", daemon=True)
+                self._booster_job.start()
+        if wait:
+            self._booster_job.join()
+        return self._booster
+
+    def _load_booster(self):
+        booster = model_bundle.load_classifier(self._booster_raw).get_booster()
+        booster.set_param({"device": "cpu"})
+        if self._nthread:
+            booster.set_param({"nthread": self._nthread})
+        self._booster = booster
+
+    def predict_proba_bulk(self, X) -> np.ndarray:
+        booster = self.bulk_booster() if self.forest is not None and len(X) >= self.BULK_ROWS else None
+        if booster is None:
+            return self.predict_proba(X)
+        return booster.inplace_predict(np.ascontiguousarray(X, dtype=np.float32), validate_features=False)
+
+    def gate_exit(self, X_scaled: np.ndarray):
+        """Cascade stage 0 → (rows the gate clears as BENIGN, their benign confidence %)."""
+        p_attack = self.gate.predict_proba(X_scaled)[:, 1]
+        return p_attack < self.gate_threshold, (1.0 - p_attack) * 100
+
+    def set_threads(self, n: int):
+        """Cap XGBoost threads → N workers × n threads stays within the cores."""
+        self._nthread = n
+        if self._booster is not None:
+            self._booster.set_param({"nthread": n})
+        if self.classifier is not None:
+            self.classifier.set_params(n_jobs=n)
+        return self
+
+    def validate(self):
+        """Raise ValueError unless the four artifacts agree with each other and predict sanely."""
+        n_features = len(self.feature_cols)
+        n_scaler   = getattr(self.scaler, "n_features_in_", n_features)
+        if n_scaler != n_features:
+            raise ValueError(f"scaler expects {n_scaler} features, feature_cols has {n_features}")
+        if self._booster is not None and self._booster.num_features() != n_features:
+            raise ValueError(f"classifier expects {self._booster.num_features()} features, "
+                             f"feature_cols has {n_features}")
+        if self.forest is not None and self.forest.feature.max() >= n_features:
+            raise ValueError(f"compiled forest splits on feature {int(self.forest.feature.max())}, "
+                             f"feature_cols has {n_features}")
+        # Probe rows: all-zero flow and the training mean, through the real predict path
+        X = np.vstack([np.zeros(n_features), self._mean])
+        if not self.raw_features:
+            X = (X - self._mean) / self._scale
+        proba = np.asarray(self.predict_proba(X.astype(np.float32)))
+        if proba.shape != (2, len(self._classes)):
+            raise ValueError(f"classifier outputs {proba.shape[1]} classes, "
+                             f"label_encoder has {len(self._classes)}")
+        if not np.isfinite(proba).all() or not np.allclose(proba.sum(axis=1), 1, atol=1e-3):
+            raise ValueError("classifier probabilities are not a valid distribution")
+        if self.gate is not None:
+            if self.gate.feature.max() >= n_features or self.gate.objective != "binary:logistic":
+                raise ValueError("cascade gate does not match feature_cols or is not binary")
+            if not 0 <= self.gate_benign < len(self._classes):
+                raise ValueError(f"cascade gate benign class {self.gate_benign} out of range")
+        return self
+
 class SecureInferPipeline:
-    def __init__(self):
+    def __init__(self, low_latency: bool = False, raw_features: bool = False,
+                 compiled: bool = False, async_briefings: bool = False, policy=None,
+                 batch_prompts: bool = False, registry: str = model_registry.REGISTRY_DIR,
+                 models: ModelSet = None, cache_size: int = 1 << 15, cascade: bool = True,
+                 metrics: Metrics = None, briefing_store=None, threads: int = None):
+        t0 = time.perf_counter()
         print("🛡️  Initializing SecureInfer pipeline...")
-        self.classifier   = pickle.load(open("models/classifier.pkl",    "rb"))
-        self.le           = pickle.load(open("models/label_encoder.pkl", "rb"))
-        self.scaler       = pickle.load(open("models/scaler.pkl",        "rb"))
-        self.feature_cols = pickle.load(open("models/feature_cols.pkl",  "rb"))
-        self.explainer    = ThreatExplainer()
-        print("✅ SecureInfer ready — zero data egress mode active.\n")
-
-    def analyze(self, raw_log: dict) -> dict:
-        t0 = time.time()
-
-        # Fix 1: Use DataFrame with column names → silences StandardScaler warning
-        row        = pd.DataFrame([{col: raw_log.get(col, 0) for col in self.feature_cols}])
-        row_scaled = self.scaler.transform(row)
-
-        # Fix 2: Pass DataFrame to XGBoost directly → stays on correct device
-        row_scaled_df = pd.DataFrame(row_scaled, columns=self.feature_cols)
-
-        pred_enc      = self.classifier.predict(row_scaled_df)[0]
-        proba         = self.classifier.predict_proba(row_scaled_df)[0]
-        confidence    = float(proba.max() * 100)
-        attack_type   = self.le.inverse_transform([pred_enc])[0]
-        severity      = SEVERITY_MAP.get(attack_type, 'MEDIUM')
-        classifier_ms = int((time.time() - t0) * 1000)
+        self.registry     = registry
+        self.raw_features = raw_features
+        self.compiled     = compiled
+        # Every request reads self.models once → a reload swaps all four artifacts together.
+        # models= hands in a set loaded before fork (api/serve.py) → shared copy-on-write
+        if models is None:
+            version, model_dir = model_registry.resolve(registry)
+            models = ModelSet(model_dir, version, raw_features, compiled).validate()
+        # threads: api/serve.py's per-worker cap, re-applied to every reloaded ModelSet
+        self.threads      = threads
+        self.models       = models.set_threads(threads) if threads else models
+        self.previous_version = None
+        self._reload_lock = threading.Lock()
+        self._rows        = threading.local()   # one preallocated row pair per worker thread
+        # Scan/flood traffic repeats exact feature vectors → skip scaler + trees (0 disables)
+        self.cache        = PredictionCache(cache_size) if cache_size else None
+        # With a gate in the model set, only flows it cannot clear as BENIGN reach the full forest
+        self.cascade      = cascade
+        # Per-stage histograms + class/LLM-outcome counters (GET /metrics); api/serve.py
+        # hands in one backed by shared memory so every worker reports into it
+        self.metrics      = metrics if metrics is not None else Metrics(classes=SEVERITY_MAP)
+        self.explainer    = ThreatExplainer(cache=ExplanationCache(), metrics=self.metrics)
+        self.policy       = policy if policy is not None else BriefingPolicy()
+        self.low_latency  = low_latency
+        # Concurrent briefings share one generation (one prompt, JSON array answer)
+        self.llm          = PromptBatcher(self.explainer) if batch_prompts else self.explainer
+        # Stage 2 off the request path: results carry a briefing_id to poll
+        # briefing_store: api/serve.py's SharedStore → any worker can answer a poll
+        self.briefings    = BriefingQueue(self.llm, workers=self.llm.max_items if batch_prompts else 2,
+                                          store=briefing_store) if async_briefings else None
+        self.startup_ms   = int((time.perf_counter() - t0) * 1000)
+        print(f"✅ SecureInfer ready in {self.startup_ms} ms — model {models.version} "
+              f"({self.models.source}, {self.models.load_ms} ms) — zero data egress mode active.\n")
+
+    classifier   = property(lambda self: self.models.classifier)
+    le           = property(lambda self: self.models.le)
+    scaler       = property(lambda self: self.models.scaler)
+    feature_cols = property(lambda self: self.models.feature_cols)
+
+    def reload(self) -> dict:
+        """Load the registry's CURRENT version off to the side, validate it, then swap it in."""
+        with self._reload_lock:
+            version, model_dir = model_registry.resolve(self.registry)
+            if version == self.models.version:
+                return {"status": "unchanged", "version": version,
+                        "previous_version": self.previous_version, "load_ms": 0}
+            t0  = time.perf_counter()
+            new = ModelSet(model_dir, version, self.raw_features, self.compiled).validate()
+            if self.threads:
+                new.set_threads(self.threads)
+            # Single reference assignment: in-flight requests finish on the version they started with
+            self.previous_version, self.models = self.models.version, new
+            return {"status": "reloaded", "version": version,
+                    "previous_version": self.previous_version,
+                    "load_ms": round((time.perf_counter() - t0) * 1000, 3)}
+
+    def _classify_fast(self, raw_log: dict, m: ModelSet = None):
+        m     = m or self.models
+        rows  = self._rows
+        watch = self.metrics.stopwatch()
+        try:
+            if getattr(rows, "n", None) != len(m.feature_cols):
+                rows.n     = len(m.feature_cols)
+                rows.work  = np.empty(rows.n, dtype=np.float64)
+                rows.row32 = np.empty((1, rows.n), dtype=np.float32)
+            work    = rows.work
+            work[:] = [raw_log.get(col, 0) for col in m.feature_cols]
+            watch.lap("vectorize")
+            if self.cache is not None:
+                key, hit = self.cache.get_one(work, m.version)
+                watch.lap("cache_lookup")
+                if hit is not None:
+                    return m._classes[hit[0]], hit[1]
+            if not m.raw_features:
+                np.subtract(work, m._mean, out=work)
+                np.divide(work, m._scale, out=work)
+            rows.row32[0] = work    # scale in float64 like StandardScaler, then cast once
+            watch.lap("scale")
+
+            if self.cascade and m.gate is not None:
+                cleared, benign_conf = m.gate_exit(rows.row32)
+                watch.lap("gate")
+                if cleared[0]:
+                    confidence = float(benign_conf[0])
+                    if self.cache is not None:
+                        self.cache.put_one(key, m.gate_benign, confidence, m.version)
+                    return m._classes[m.gate_benign], confidence
+            if m.forest is not None:
+                proba = m.forest.predict_proba(rows.row32)[0]
+            else:
+                proba = m._booster.inplace_predict(rows.row32, validate_features=False)[0]
+            pred_enc   = int(proba.argmax())
+            confidence = float(proba[pred_enc] * 100)
+            watch.lap("predict")
+            if self.cache is not None:
+                self.cache.put_one(key, pred_enc, confidence, m.version)
+            attack_type = m._classes[pred_enc]
+            watch.lap("decode")
+            return attack_type, confidence
+        finally:
+            watch.done()
+
+    def brief(self, attack_type: str, flow: dict, confidence: float) -> dict:
+        """Stage 2 alone, for a flow already classified elsewhere (e.g. /ws/flows batches)."""
+        return self._briefing(attack_type, flow, confidence, explain=True)
 
+    def _briefing(self, attack_type: str, raw_log: dict, confidence: float, explain: bool,
+                  on_partial=None):
         # Stage 2 — LLM briefing (only for non-BENIGN)
         if attack_type == 'BENIGN':
-            briefing = {
+            return {
                 "summary":      "Traffic is normal. No threat detected.",
                 "severity":     "SAFE",
                 "impact":       "None.",
                 "action":       "No action required.",
                 "inference_ms": 0
             }
-        else:
-            briefing = self.explainer.explain(attack_type, raw_log, confidence)
+        if not explain:
+            return None
+        # Confident, high-volume classes get a deterministic template instead of phi3
+        templated = self.policy.render(attack_type, raw_log, confidence,
+                                       SEVERITY_MAP.get(attack_type, 'MEDIUM'))
+        if templated is not None:
+            return templated
+        if self.briefings is not None:
+            return {
+                "status":       "pending",
+                "briefing_id":  self.briefings.submit(attack_type, raw_log, confidence),
+                "inference_ms": 0
+            }
+        return self.llm.explain(attack_type, raw_log, confidence, on_partial=on_partial)
 
-        total_ms = int((time.time() - t0) * 1000)
+    def _result(self, attack_type, confidence, briefing, classifier_ms, t0) -> dict:
+        llm_ms = briefing.get("inference_ms", 0) if briefing else 0
         return {
             "attack_type":   attack_type,
-            "severity":      severity,
+            "severity":      SEVERITY_MAP.get(attack_type, 'MEDIUM'),
             "confidence":    round(confidence, 1),
             "briefing":      briefing,
+            "briefing_id":   briefing.get("briefing_id") if briefing else None,
             "is_threat":     attack_type != 'BENIGN',
-            "classifier_ms": classifier_ms,
-            "llm_ms":        briefing.get("inference_ms", 0),
-            "total_ms":      total_ms,
+            "classifier_ms": round(classifier_ms, 3),
+            "llm_ms":        llm_ms,
+            "ttft_ms":       briefing.get("ttft_ms", llm_ms) if briefing else 0,
+            "total_ms":      round((time.perf_counter() - t0) * 1000, 3),
         }
+
+    def analyze(self, raw_log: dict, explain: bool = True, on_partial=None) -> dict:
+        t0 = time.perf_counter()
+        m  = self.models
+        classify = self._classify_fast if self.low_latency else self._classify_reference
+        attack_type, confidence = classify(raw_log, m)
+        classifier_ms = (time.perf_counter() - t0) * 1000
+        self.metrics.count_class(attack_type)
+
+        briefing = self._briefing(attack_type, raw_log, confidence, explain, on_partial)
+        result   = self._result(attack_type, confidence, briefing, classifier_ms, t0)
+        self.metrics.observe("total", int((time.perf_counter() - t0) * 1e9))
+        return result
+
+    def _classify_reference(self, raw_log: dict, m: ModelSet):
+        watch = self.metrics.stopwatch()
+        try:
+            values = [raw_log.get(col, 0) for col in m.feature_cols]
+            watch.lap("vectorize")
+            if self.cache is not None:
+                key, hit = self.cache.get_one(np.array(values, dtype=np.float64), m.version)
+                watch.lap("cache_lookup")
+                if hit is not None:
+                    return m.le.inverse_transform([hit[0]])[0], hit[1]
+
+            import pandas as pd     # only this reference path needs pandas
+            # Fix 1: Use DataFrame with column names → silences StandardScaler warning
+            row        = pd.DataFrame([values], columns=m.feature_cols)
+            row_scaled = row.to_numpy(dtype=np.float64) if m.raw_features else m.scaler.transform(row)
+
+            # Fix 2: Pass DataFrame to XGBoost directly → stays on correct device
+            row_scaled_df = pd.DataFrame(row_scaled, columns=m.feature_cols)
+            watch.lap("scale")
+
+            cleared = False
+            if self.cascade and m.gate is not None:
+                cleared, benign_conf = m.gate_exit(np.asarray(row_scaled, dtype=np.float32))
+                cleared = bool(cleared[0])
+                watch.lap("gate")
+            if cleared:
+                pred_enc, confidence = m.gate_benign, float(benign_conf[0])
+            else:
+                # One model pass: label is the argmax of the class probabilities
+                proba      = m.predict_proba(row_scaled_df)[0]
+                pred_enc   = int(proba.argmax())
+                confidence = float(proba[pred_enc] * 100)
+                watch.lap("predict")
+            attack_type = m.le.inverse_transform([pred_enc])[0]
+            watch.lap("decode")
+            if self.cache is not None:
+                self.cache.put_one(key, pred_enc, confidence, m.version)
+            return attack_type, confidence
+        finally:
+            watch.done()
+
+    def to_matrix(self, flows, m: ModelSet = None) -> np.ndarray:
+        """N flow dicts (or an N×F array already in feature_cols order) → float64 matrix."""
+        feature_cols = (m or self.models).feature_cols
+        if isinstance(flows, np.ndarray):
+            X = np.asarray(flows, dtype=np.float64)
+            if X.ndim != 2 or X.shape[1] != len(feature_cols):
+                raise ValueError(f"Expected shape (N, {len(feature_cols)}), got {X.shape}")
+            return X
+        return np.array(
+            [[f.get(col, 0) for col in feature_cols] for f in flows],
+            dtype=np.float64
+        ).reshape(-1, len(feature_cols))
+
+    def classify_matrix(self, X: np.ndarray, m: ModelSet = None):
+        """Raw N×F matrix in feature_cols order → (class indices, confidence %), no per-row objects."""
+        m = m or self.models
+        if len(X) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        watch = self.metrics.stopwatch()
+        try:
+            if self.cache is None:
+                pred_enc, confidence = self._score_matrix(X, m, watch)
+            else:
+                # Cache hits and in-batch repeats are stripped before scaling/scoring
+                pred_enc, confidence, misses = self.cache.lookup(X, m.version)
+                watch.lap("batch_cache_lookup")
+                if len(misses):
+                    p, c = self._score_matrix(X[misses.unique], m, watch)
+                    pred_enc[misses.index]   = p[misses.inverse]
+                    confidence[misses.index] = c[misses.inverse]
+                    self.cache.store(misses, p, c, m.version)
+        finally:
+            watch.done()
+        self.metrics.count_classes(m.le.classes_, pred_enc)
+        return pred_enc, confidence
+
+    def _score_matrix(self, X: np.ndarray, m: ModelSet, watch):
+        # Same float64 (x - mean) / scale as StandardScaler.transform, minus the DataFrame;
+        # raw mode compares float32(x) with folded splits → exact parity for float32 inputs
+        X_scaled = X if m.raw_features else (np.asarray(X, dtype=np.float64) - m._mean) / m._scale
+        watch.lap("batch_scale")
+        if not self.cascade or m.gate is None:
+            return self._score_full(X_scaled, m, watch)
+        cleared, confidence = m.gate_exit(X_scaled)
+        watch.lap("batch_gate")
+        pred_enc = np.full(len(X_scaled), m.gate_benign, dtype=np.int64)
+        rest     = np.flatnonzero(~cleared)
+        if len(rest):
+            pred_enc[rest], confidence[rest] = self._score_full(X_scaled[rest], m, watch)
+        return pred_enc, confidence
+
+    def _score_full(self, X_scaled: np.ndarray, m: ModelSet, watch):
+        proba      = m.predict_proba_bulk(X_scaled)
+        pred_enc   = proba.argmax(axis=1)
+        confidence = proba[np.arange(len(pred_enc)), pred_enc] * 100
+        watch.lap("batch_predict")
+        return pred_enc, confidence
+
+    def classify_batch(self, flows, m: ModelSet = None):
+        """Stage 1 for a whole batch: one scale + one predict_proba over the matrix."""
+        m  = m or self.models
+        t0 = time.perf_counter_ns()
+        X  = self.to_matrix(flows, m)
+        self.metrics.observe("batch_vectorize", time.perf_counter_ns() - t0)
+        if len(X) == 0:
+            return np.empty(0, dtype=object), np.empty(0)
+        pred_enc, confidence = self.classify_matrix(X, m)
+        t0 = time.perf_counter_ns()
+        attack_types = m.le.inverse_transform(pred_enc)
+        self.metrics.observe("batch_decode", time.perf_counter_ns() - t0)
+        return attack_types, confidence
+
+    def analyze_batch(self, flows, explain: bool = True) -> list:
+        t0 = time.perf_counter()
+        m  = self.models
+        attack_types, confidences = self.classify_batch(flows, m)
+        classifier_ms = (time.perf_counter() - t0) * 1000
+
+        is_matrix = isinstance(flows, np.ndarray)
+        results   = []
+        for i, (attack_type, confidence) in enumerate(zip(attack_types, confidences.tolist())):
+            raw_log  = dict(zip(m.feature_cols, flows[i].tolist())) if is_matrix else flows[i]
+            briefing = self._briefing(attack_type, raw_log, confidence, explain)
+            results.append(self._result(attack_type, confidence, briefing, classifier_ms, t0))
+        return results
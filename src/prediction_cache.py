@@ -0,0 +1,140 @@
+import threading
+import numpy as np
+
+# Per-column odd multipliers for the row hash (splitmix64 outputs)
+_MULT = np.array([0x9E3779B97F4A7C15, 0xBF58476D1CE4E5B9, 0x94D049BB133111EB, 0xD6E8FEB86659FD93,
+                  0xA0761D6478BD642F, 0xE7037ED1A0B428DB, 0x8EBC6AF09C88C6E3, 0x589965CC75374CC3],
+                 dtype=np.uint64)
+
+def _row_hash(Xu: np.ndarray) -> np.ndarray:
+    """64-bit hash per row of a uint64 view; fully vectorized, no per-row Python."""
+    w = Xu ^ (Xu >> np.uint64(32))              # float bit patterns: fold exponent into low bits
+    h = (w * np.resize(_MULT, Xu.shape[1])).sum(axis=1, dtype=np.uint64)
+    h ^= h >> np.uint64(31)
+    h *= np.uint64(0xBF58476D1CE4E5B9)
+    h ^= h >> np.uint64(29)
+    return h
+
+class Misses:
+    """Rows of a lookup that need the classifier, de-duplicated within the batch."""
+    def __init__(self, index, unique, inverse, rows, h):
+        self.index   = index      # positions in X that missed
+        self.unique  = unique     # positions in X to score (one per distinct vector)
+        self.inverse = inverse    # index[k] takes the result of unique[inverse[k]]
+        self.rows    = rows       # bit patterns of the unique rows, for store()
+        self.h       = h
+
+    def __len__(self):
+        return len(self.index)
+
+class PredictionCache:
+    """
+    Direct-mapped cache of classifier results keyed on the exact raw feature
+    vector (its bit pattern, so rows with NaN hit too). Each vector hashes to
+    one of `size` slots and evicts whatever held it — bounded memory, and a
+    batch lookup is a handful of array ops. Single flows (get_one/put_one)
+    skip the array machinery: a bounded dict keyed on the row's bytes, a
+    dict probe instead of hash + unique + compare. Both are cleared whenever
+    the model version they are asked about changes.
+    """
+    def __init__(self, size: int = 1 << 15):
+        self.size          = 1 << max(size - 1, 1).bit_length()
+        self.version       = None
+        self._lock         = threading.Lock()
+        self._rows         = np.zeros((self.size, 0), dtype=np.uint64)
+        self._one          = {}         # row bytes → (pred_enc, confidence), insertion-ordered
+        self.hits          = 0
+        self.misses        = 0
+        self.deduped       = 0
+        self.invalidations = 0
+
+    def _check(self, version: str, n_features: int):
+        if version == self.version and self._rows.shape[1] == n_features:
+            return
+        if self.version is not None:
+            self.invalidations += 1
+        self.version = version
+        self._one.clear()
+        self._rows   = np.zeros((self.size, n_features), dtype=np.uint64)
+        self._hash   = np.zeros(self.size, dtype=np.uint64)
+        self._valid  = np.zeros(self.size, dtype=bool)
+        self._pred   = np.zeros(self.size, dtype=np.int64)
+        self._conf   = np.zeros(self.size, dtype=np.float64)
+
+    def lookup(self, X: np.ndarray, version: str):
+        """
+        N×F raw matrix → (pred_enc, confidence, Misses). Hit rows are filled in;
+        the caller scores X[misses.unique] and hands the results to store().
+        """
+        Xu   = np.ascontiguousarray(X, dtype=np.float64).view(np.uint64)
+        h    = _row_hash(Xu)
+        slot = (h & np.uint64(self.size - 1)).astype(np.intp)
+        with self._lock:
+            self._check(version, Xu.shape[1])
+            hit  = self._valid[slot] & (self._hash[slot] == h) & (self._rows[slot] == Xu).all(axis=1)
+            pred = self._pred[slot]
+            conf = self._conf[slot]
+            n_hit = int(hit.sum())
+            self.hits   += n_hit
+            self.misses += len(X) - n_hit
+
+        index = np.flatnonzero(~hit)
+        h_m   = h[index]
+        # Flood batches repeat vectors → score each distinct one once
+        _, first, inverse = np.unique(h_m, return_index=True, return_inverse=True)
+        if len(first) < len(index) and not (Xu[index] == Xu[index[first][inverse]]).all():
+            first, inverse = np.arange(len(index)), np.arange(len(index))   # 64-bit collision: no dedup
+        unique = index[first]
+        self.deduped += len(index) - len(unique)
+        return pred, conf, Misses(index, unique, inverse.reshape(-1), Xu[unique], h_m[first])
+
+    def store(self, misses: Misses, pred_enc: np.ndarray, confidence: np.ndarray, version: str):
+        """Results for X[misses.unique], in that order."""
+        slot = (misses.h & np.uint64(self.size - 1)).astype(np.intp)
+        with self._lock:
+            if version != self.version:         # model swapped mid-batch → don't mix versions
+                return
+            self._rows[slot]  = misses.rows
+            self._hash[slot]  = misses.h
+            self._pred[slot]  = pred_enc
+            self._conf[slot]  = confidence
+            self._valid[slot] = True
+
+    def get_one(self, row: np.ndarray, version: str):
+        """float64 feature row → (key for put_one, (pred_enc, confidence) or None)."""
+        key = row.tobytes()
+        with self._lock:
+            self._check(version, len(row))
+            hit = self._one.get(key)
+            if hit is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return key, hit
+
+    def put_one(self, key: bytes, pred_enc: int, confidence: float, version: str):
+        with self._lock:
+            if version != self.version:
+                return
+            if len(self._one) >= self.size:
+                del self._one[next(iter(self._one))]        # FIFO eviction
+            self._one[key] = (pred_enc, confidence)
+
+    def clear(self):
+        with self._lock:
+            self.version = None
+            self._rows   = np.zeros((self.size, 0), dtype=np.uint64)
+            self._one    = {}
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "slots":         self.size,
+            "entries":       int(self._valid.sum()) + len(self._one) if self.version is not None else 0,
+            "model_version": self.version,
+            "hits":          self.hits,
+            "misses":        self.misses,
+            "hit_ratio":     round(self.hits / lookups, 4) if lookups else 0.0,
+            "deduped":       self.deduped,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,68 @@
+import threading, time
+from concurrent.futures import Future
+
+class PromptBatcher:
+    """
+    Coalesces concurrent explain() calls into one LLM generation.
+
+    The first pending request opens a window; everything that arrives within
+    `window_ms` (or until `max_items` are queued) is sent as a single prompt
+    via ThreatExplainer.explain_many. Flows whose answer is missing or invalid
+    fall back to the regular per-flow explain() in the caller's thread.
+    """
+    def __init__(self, explainer, window_ms: float = 50.0, max_items: int = 8):
+        self.explainer = explainer
+        self.cache     = getattr(explainer, "cache", None)   # BriefingQueue coalesces on it
+        self.window_s  = window_ms / 1000
+        self.max_items = max_items
+        self._pending  = []                      # [(item, Future)]
+        self._cond     = threading.Condition()
+        self.counts    = {"batches": 0, "items": 0, "fallbacks": 0}
+        threading.Thread(target=self._run, name="prompt-batcher", daemon=True).start()
+
+    def explain(self, attack_type: str, features: dict, confidence: float,
+                on_partial=None) -> dict:
+        if on_partial is not None:               # streaming is inherently per flow
+            return self.explainer.explain(attack_type, features, confidence, on_partial)
+        future = Future()
+        with self._cond:
+            self._pending.append(((attack_type, features, confidence), future))
+            self._cond.notify()
+        briefing = future.result()
+        if briefing is None:
+            with self._cond:
+                self.counts["fallbacks"] += 1
+            briefing = self.explainer.explain(attack_type, features, confidence)
+        return briefing
+
+    def _take_batch(self) -> list:
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            deadline = time.monotonic() + self.window_s
+            while len(self._pending) < self.max_items:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch, self._pending = self._pending[:self.max_items], self._pending[self.max_items:]
+            self.counts["batches"] += 1
+            self.counts["items"]   += len(batch)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            try:
+                results = self.explainer.explain_many([item for item, _ in batch])
+            except Exception as e:
+                print(f"⚠️  Prompt batch failed: {e}")
+                results = [None] * len(batch)
+            for (_, future), briefing in zip(batch, results):
+                future.set_result(briefing)
+
+    def stats(self) -> dict:
+        with self._cond:
+            batches = self.counts["batches"]
+            return dict(self.counts, pending=len(self._pending),
+                        avg_batch=round(self.counts["items"] / batches, 2) if batches else 0.0)
@@ -0,0 +1,203 @@
+"""
+Offline scoring of flow captures: CICFlowMeter CSV or JSONL (file or stdin)
+streamed through SecureInferPipeline in fixed-size chunks — or a raw pcap,
+assembled into flows on the fly by src/flowmeter.py.
+
+    python3 src/score.py capture.csv -o results.parquet
+    python3 src/score.py flows.jsonl -o results.jsonl --explain defer
+    cat capture.csv | python3 src/score.py - --format csv -o - > results.jsonl
+    python3 src/score.py traffic.pcap -o results.parquet
+    python3 src/score.py --briefings-from results.pending.jsonl -o briefings.jsonl
+
+Memory is bounded by --chunksize: each chunk is parsed, classified and
+appended to the output (JSONL lines / Parquet row groups) before the next
+is read. Rows are never dropped — ±inf becomes NaN and the trees take
+their missing-value branch. --explain: none (default), inline (LLM per
+threat while scoring), or defer (threats go to <output>.pending.jsonl for
+a later --briefings-from pass).
+"""
+import numpy as np, pandas as pd, json, time, sys, os, argparse, resource, itertools
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.pipeline import SecureInferPipeline, SEVERITY_MAP
+
+# Carried through to the output when the capture has them
+KEEP_COLUMNS = ["Flow ID", "Source IP", "Source Port", "Destination IP", "Timestamp", "Label"]
+BRIEF_GROUP  = 8    # threats per batched LLM prompt (PromptBatcher's default)
+RESULTS      = sys.stdout   # main() points sys.stdout at stderr → only results go here
+
+def read_chunks(path: str, fmt: str, chunksize: int):
+    """Yield DataFrames of at most chunksize rows with stripped column names."""
+    src = sys.stdin if path == "-" else path
+    if fmt == "pcap":
+        from src import flowmeter
+        for block in flowmeter.read_flows(sys.stdin.buffer if path == "-" else path, batch_rows=chunksize):
+            yield flowmeter.to_frame(block)
+    elif fmt == "csv":
+        for chunk in pd.read_csv(src, chunksize=chunksize, encoding='utf-8', low_memory=False):
+            chunk.columns = chunk.columns.str.strip()
+            yield chunk
+    else:
+        lines = sys.stdin if path == "-" else open(path, encoding='utf-8')
+        with lines:
+            while True:
+                window = list(itertools.islice(lines, chunksize))
+                if not window:          # end of input — a window of blank lines is not
+                    return
+                block = [json.loads(l) for l in window if l.strip()]
+                if block:
+                    yield pd.DataFrame.from_records(block)
+
+def to_features(chunk: pd.DataFrame, feature_cols: list) -> np.ndarray:
+    # Missing columns → 0 like /analyze; ±inf and unparsable cells → NaN (missing)
+    X = chunk.reindex(columns=feature_cols, fill_value=0)
+    X = X.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64, copy=True)
+    X[np.isinf(X)] = np.nan
+    return X
+
+class ResultWriter:
+    """Appends one scored chunk at a time to JSONL (file or stdout) or Parquet."""
+    def __init__(self, path: str):
+        self.path   = path
+        self.kind   = "parquet" if path.endswith(".parquet") else "jsonl"
+        self._pq    = None
+        self._out   = RESULTS if path == "-" else (open(path, "w") if self.kind == "jsonl" else None)
+
+    def write(self, df: pd.DataFrame):
+        if self.kind == "jsonl":
+            if len(df):
+                self._out.write(df.to_json(orient="records", lines=True).rstrip("\n") + "\n")
+            return
+        import pyarrow as pa, pyarrow.parquet as pq
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._pq is None:
+            # An all-None first chunk (e.g. no threats → no briefings) must not pin a null column
+            schema   = pa.schema([f.with_type(pa.string()) if pa.types.is_null(f.type) else f
+                                  for f in table.schema])
+            self._pq = pq.ParquetWriter(self.path, schema)
+        self._pq.write_table(table.cast(self._pq.schema))
+
+    def close(self):
+        if self._pq is not None:
+            self._pq.close()
+        if self._out not in (None, RESULTS):
+            self._out.close()
+
+def briefings_for(pipeline, rows: list) -> list:
+    """Policy templates first, then batched LLM prompts (cache hits skip the model)."""
+    explainer = pipeline.explainer
+    out, todo = [None] * len(rows), []
+    for i, (attack_type, features, confidence) in enumerate(rows):
+        out[i] = pipeline.policy.render(attack_type, features, confidence,
+                                        SEVERITY_MAP.get(attack_type, 'MEDIUM'))
+        if out[i] is None:
+            todo.append(i)
+    for g in range(0, len(todo), BRIEF_GROUP):
+        group = todo[g:g + BRIEF_GROUP]
+        for i, briefing in zip(group, explainer.explain_many([rows[i] for i in group])):
+            out[i] = briefing if briefing is not None else explainer.explain(*rows[i])
+    return out
+
+def score(args):
+    pipeline     = SecureInferPipeline()
+    m            = pipeline.models
+    feature_cols = m.feature_cols
+    classes      = np.asarray([str(c) for c in m.le.classes_], dtype=object)
+    severity     = np.asarray([SEVERITY_MAP.get(c, 'MEDIUM') for c in classes], dtype=object)
+    writer       = ResultWriter(args.output)
+    pending      = None
+    if args.explain == "defer":
+        stem    = "scores" if args.output == "-" else os.path.splitext(args.output)[0]
+        pending = open(f"{stem}.pending.jsonl", "w")
+
+    fmt    = args.format or ("jsonl" if args.input.endswith((".jsonl", ".ndjson")) else
+                             "pcap" if args.input.endswith((".pcap", ".cap")) else "csv")
+    counts = np.zeros(len(classes), dtype=np.int64)
+    rows = missing = 0
+    t0   = time.time()
+    try:
+        for chunk in read_chunks(args.input, fmt, args.chunksize):
+            X = to_features(chunk, feature_cols)
+            missing += int(np.isnan(X).any(axis=1).sum())
+            pred_enc, confidence = pipeline.classify_matrix(X, m)
+            counts  += np.bincount(pred_enc, minlength=len(classes))
+
+            out = chunk[[c for c in KEEP_COLUMNS if c in chunk.columns]].reset_index(drop=True)
+            out.insert(0, "row", np.arange(rows, rows + len(chunk)))
+            out["attack_type"] = classes[pred_enc]
+            out["severity"]    = severity[pred_enc]
+            out["confidence"]  = np.round(confidence.astype(np.float64), 2)
+            out["is_threat"]   = out["attack_type"] != "BENIGN"
+
+            threats = np.flatnonzero(out["is_threat"].to_numpy())
+            items   = [(classes[pred_enc[i]],
+                        {c: (None if np.isnan(v) else float(v)) for c, v in zip(feature_cols, X[i])},
+                        float(confidence[i])) for i in threats] if args.explain != "none" else []
+            if args.explain == "inline":
+                # Column on every chunk (None for benign) → one stable Parquet schema
+                briefing = np.full(len(out), None, dtype=object)
+                briefing[threats] = [json.dumps(b) for b in briefings_for(pipeline, items)]
+                out["briefing"] = briefing
+            elif pending is not None:
+                for i, (attack_type, features, conf) in zip(threats, items):
+                    pending.write(json.dumps({"row": rows + int(i), "attack_type": attack_type,
+                                              "confidence": conf, "features": features}) + "\n")
+
+            writer.write(out)
+            rows += len(chunk)
+            elapsed = time.time() - t0
+            print(f"   {rows:>12,} flows | {rows / elapsed:>10,.0f} flows/s")
+    finally:
+        writer.close()
+        if pending is not None:
+            pending.close()
+
+    elapsed = time.time() - t0
+    print(f"\n✅ Scored {rows:,} flows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} flows/s)")
+    print(f"   Rows with missing/inf features: {missing:,}")
+    print(f"   Peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+    for i in np.argsort(-counts):
+        if counts[i]:
+            print(f"   {classes[i]:<28} {counts[i]:>12,}")
+    if pending is not None:
+        print(f"📝 Threats queued for briefings: {pending.name}")
+        print(f"   Next: python3 src/score.py --briefings-from {pending.name} -o briefings.jsonl")
+
+def brief_pending(args):
+    pipeline = SecureInferPipeline()
+    writer   = ResultWriter(args.output)
+    done, t0 = 0, time.time()
+    try:
+        for chunk in read_chunks(args.briefings_from, "jsonl", args.chunksize):
+            items = [(r.attack_type, r.features, r.confidence) for r in chunk.itertuples()]
+            writer.write(pd.DataFrame({
+                "row":         chunk["row"],
+                "attack_type": chunk["attack_type"],
+                "briefing":    [json.dumps(b) for b in briefings_for(pipeline, items)],
+            }))
+            done += len(chunk)
+            print(f"   {done:>10,} briefings | {done / (time.time() - t0):>8,.1f}/s")
+    finally:
+        writer.close()
+    print(f"\n✅ {done:,} briefings → {args.output}")
+
+def main():
+    ap = argparse.ArgumentParser(description="Stream a flow capture through SecureInfer")
+    ap.add_argument("input", nargs="?", help="CSV / JSONL file, or - for stdin")
+    ap.add_argument("-o", "--output", default="-", help="results .jsonl / .parquet, or - for stdout")
+    ap.add_argument("--format", choices=["csv", "jsonl", "pcap"], help="input format (default: by extension)")
+    ap.add_argument("--chunksize", type=int, default=50_000, help="rows per chunk")
+    ap.add_argument("--explain", choices=["none", "inline", "defer"], default="none",
+                    help="LLM briefings for threats")
+    ap.add_argument("--briefings-from", help="second pass: brief a .pending.jsonl from --explain defer")
+    args = ap.parse_args()
+    sys.stdout = sys.stderr     # progress and pipeline logs never mix into "-o -" results
+
+    if args.briefings_from:
+        brief_pending(args)
+    elif args.input:
+        score(args)
+    else:
+        ap.error("give an input file (or -), or --briefings-from")
+
+if __name__ == "__main__":
+    main()
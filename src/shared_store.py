@@ -0,0 +1,82 @@
+import json, os, sqlite3, threading, time
+
+class SharedStore:
+    """
+    State every api/serve.py worker can see: briefing results keyed by
+    briefing_id and each worker's latest stats snapshot, in a small SQLite
+    file (WAL) created by the parent before fork. Connections are opened
+    lazily per process and thread, so none crosses the fork. Briefing rows
+    are pruned to the newest max_results, like BriefingQueue's own LRU.
+    """
+    def __init__(self, path: str, max_results: int = 10_000):
+        self.path        = path
+        self.max_results = max_results
+        self.worker      = 0                # api/serve.py: the worker's slot
+        self._local      = threading.local()
+        self._writes     = 0
+        db = sqlite3.connect(path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS briefings (id TEXT PRIMARY KEY, status TEXT, briefing TEXT)")
+        db.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT, worker INTEGER, pid INTEGER, "
+                   "stats TEXT, PRIMARY KEY (name, worker))")
+        db.commit()
+        db.close()
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA synchronous=OFF")     # results are disposable; skip the fsyncs
+            self._local.db, self._local.pid = db, os.getpid()
+        return db
+
+    def put_briefings(self, ids: list, status: str, briefing=None):
+        data = json.dumps(briefing, default=str) if briefing is not None else None
+        db   = self._db()
+        # REPLACE re-inserts → the rowid order is last-update order, i.e. an LRU
+        db.executemany("INSERT OR REPLACE INTO briefings VALUES (?, ?, ?)",
+                       [(i, status, data) for i in ids])
+        self._writes += len(ids)
+        if self._writes >= 256:
+            self._writes = 0
+            db.execute("DELETE FROM briefings WHERE rowid <= (SELECT max(rowid) FROM briefings) - ?",
+                       (self.max_results,))
+
+    def get_briefing(self, briefing_id: str):
+        row = self._db().execute("SELECT status, briefing FROM briefings WHERE id = ?",
+                                 (briefing_id,)).fetchone()
+        if row is None:
+            return None
+        return {"status": row[0], "briefing": json.loads(row[1]) if row[1] is not None else None}
+
+    def wait_briefing(self, briefing_id: str, wait_s: float = 0.0, poll_s: float = 0.05):
+        """get_briefing, re-read every poll_s for up to wait_s while it is still pending."""
+        deadline = time.monotonic() + wait_s
+        entry    = self.get_briefing(briefing_id)
+        while entry is not None and entry["status"] == "pending" and time.monotonic() < deadline:
+            time.sleep(poll_s)
+            entry = self.get_briefing(briefing_id)
+        return entry
+
+    def publish(self, name: str, stats: dict):
+        self._db().execute("INSERT OR REPLACE INTO stats VALUES (?, ?, ?, ?)",
+                           (name, self.worker, os.getpid(), json.dumps(stats, default=str)))
+
+    def collect(self, name: str) -> dict:
+        """Every worker's last `name` snapshot, summed, with the per-worker breakdown."""
+        rows    = self._db().execute("SELECT worker, pid, stats FROM stats WHERE name = ? ORDER BY worker",
+                                     (name,)).fetchall()
+        workers = [dict(json.loads(s), worker=w, pid=p) for w, p, s in rows]
+        total   = {}
+        for stats in workers:
+            for k, v in stats.items():
+                if k in ("worker", "pid"):
+                    continue
+                if isinstance(v, (int, float)) and not isinstance(v, bool):
+                    total[k] = total.get(k, 0) + v
+                elif total.setdefault(k, v) != v:
+                    total[k] = None             # e.g. workers on different model versions mid-reload
+        if "hits" in total and "misses" in total:
+            lookups = total["hits"] + total["misses"]
+            total["hit_ratio"] = round(total["hits"] / lookups, 4) if lookups else 0.0
+        return dict(total, per_worker=workers)
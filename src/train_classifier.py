@@ -1,21 +1,56 @@
-import numpy as np, pickle, time
+import numpy as np, pickle, time, json, os, argparse
+import xgboost as xgb
 from xgboost import XGBClassifier
 from sklearn.metrics import classification_report, accuracy_score
 
-def main():
-    print("📂 Loading preprocessed data...")
-    X_train = np.load("models/X_train.npy")
-    X_test  = np.load("models/X_test.npy")
-    y_train = np.load("models/y_train.npy")
-    y_test  = np.load("models/y_test.npy")
-    le      = pickle.load(open("models/label_encoder.pkl", "rb"))
-    print(f"✅ {X_train.shape[0]:,} train | {X_test.shape[0]:,} test | {len(le.classes_)} classes")
+MANIFEST_PATH = "models/dataset.json"
+GATE_PATH     = "models/gate.pkl"
 
-    print("\n🚀 Training XGBoost on GPU...")
-    print("   (Same code runs on AMD ROCm unchanged — PyTorch-portable)")
-    t0 = time.time()
+def load_split(name: str):
+    # Memory-mapped: pages stream in from disk instead of a full resident copy
+    X = np.load(f"models/X_{name}.npy", mmap_mode='r')
+    y = np.load(f"models/y_{name}.npy", mmap_mode='r')
+    return X, y
+
+class NpyBatches(xgb.DataIter):
+    """Feeds a memory-mapped split to XGBoost in row batches (external memory)."""
+    def __init__(self, X, y, batch_rows: int = 1 << 20, cache_prefix: str = "models/xgb_cache"):
+        self.X, self.y, self.batch_rows, self._i = X, y, batch_rows, 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data) -> bool:
+        if self._i >= len(self.X):
+            return False
+        sl = slice(self._i, self._i + self.batch_rows)
+        input_data(data=np.asarray(self.X[sl], dtype=np.float32), label=np.asarray(self.y[sl]))
+        self._i += self.batch_rows
+        return True
 
-    model = XGBClassifier(
+    def reset(self):
+        self._i = 0
+
+def predict_in_batches(model, X, batch_rows: int = 1 << 20) -> np.ndarray:
+    return np.concatenate([
+        model.predict(np.asarray(X[i:i + batch_rows]))
+        for i in range(0, len(X), batch_rows)
+    ])
+
+def fit_external_memory(model, X_train, y_train, X_test, y_test, n_classes: int):
+    """Same hyper-parameters as model.fit, but quantized page by page from disk."""
+    make   = getattr(xgb, "ExtMemQuantileDMatrix", None)
+    dtrain = make(NpyBatches(X_train, y_train)) if make else xgb.DMatrix(NpyBatches(X_train, y_train))
+    dtest  = make(NpyBatches(X_test, y_test, cache_prefix="models/xgb_cache_test"), ref=dtrain) \
+             if make else xgb.DMatrix(NpyBatches(X_test, y_test, cache_prefix="models/xgb_cache_test"))
+
+    params = model.get_xgb_params()
+    params.update(objective="multi:softprob", num_class=n_classes)
+    booster = xgb.train(params, dtrain, num_boost_round=model.n_estimators,
+                        evals=[(dtest, "validation_0")], verbose_eval=25)
+    model.load_model(bytearray(booster.save_raw("json")))
+    return model
+
+def make_model() -> XGBClassifier:
+    return XGBClassifier(
         n_estimators=200,
         max_depth=8,
         learning_rate=0.1,
@@ -27,14 +62,97 @@ def main():
         n_jobs=-1,
         random_state=42
     )
-    model.fit(
-        X_train, y_train,
-        eval_set=[(X_test, y_test)],
-        verbose=25
+
+def make_gate_model() -> XGBClassifier:
+    # Cascade stage 0: a handful of shallow trees, BENIGN vs any attack
+    return XGBClassifier(
+        n_estimators=8,
+        max_depth=3,
+        learning_rate=0.3,
+        eval_metric='logloss',
+        tree_method='hist',
+        device='cuda',
+        n_jobs=-1,
+        random_state=42
     )
 
+def gate_threshold(p_attack: np.ndarray, is_attack: np.ndarray, target_recall: float) -> float:
+    """Highest threshold whose early exits (p_attack < t) still pass ≥ target_recall of the attacks."""
+    p = np.sort(p_attack[is_attack])
+    if len(p) == 0:
+        return 1.0
+    return float(p[int(np.floor((1.0 - target_recall) * len(p)))])
+
+def train_gate(X_train, y_train, X_test, y_test, benign: int, target_recall: float) -> dict:
+    print(f"\n🚦 Training cascade gate (benign vs attack, target recall {target_recall:.2%})...")
+    t0   = time.time()
+    gate = make_gate_model()
+    gate.fit(X_train, (np.asarray(y_train) != benign).astype(np.int8))
+
+    p_attack  = np.concatenate([gate.predict_proba(np.asarray(X_test[i:i + (1 << 20)]))[:, 1]
+                                for i in range(0, len(X_test), 1 << 20)])
+    is_attack = np.asarray(y_test) != benign
+    threshold = gate_threshold(p_attack, is_attack, target_recall)
+    exits     = p_attack < threshold
+    info = {
+        "model":         gate,
+        "threshold":     threshold,
+        "benign":        benign,
+        "target_recall": target_recall,
+        "recall":        float((~exits[is_attack]).mean()) if is_attack.any() else 1.0,
+        "exit_rate":     float(exits.mean()),
+        "benign_exit":   float(exits[~is_attack].mean()) if (~is_attack).any() else 0.0,
+    }
+    pickle.dump(info, open(GATE_PATH, "wb"))
+    print(f"   Threshold     : p(attack) < {threshold:.4f} exits early")
+    print(f"   Attack recall : {info['recall']:.4%} on X_test (target {target_recall:.2%})")
+    print(f"   Early exits   : {info['exit_rate']:.1%} of X_test, {info['benign_exit']:.1%} of BENIGN")
+    print(f"✅ Saved: {GATE_PATH} ({round(time.time() - t0, 1)}s)")
+    return info
+
+def main():
+    ap = argparse.ArgumentParser(description="Train the SecureInfer XGBoost classifier")
+    ap.add_argument("--external-memory", action="store_true",
+                    help="stream training batches from the memory-mapped .npy files")
+    ap.add_argument("--gate", action="store_true",
+                    help="also train the benign/attack cascade gate (models/gate.pkl)")
+    ap.add_argument("--gate-only", action="store_true",
+                    help="(re)train and re-tune only the gate, keep classifier.pkl")
+    ap.add_argument("--gate-recall", type=float, default=0.999,
+                    help="attack recall the gate threshold must keep on X_test")
+    args = ap.parse_args()
+
+    print("📂 Loading preprocessed data (memory-mapped)...")
+    X_train, y_train = load_split("train")
+    X_test,  y_test  = load_split("test")
+    le      = pickle.load(open("models/label_encoder.pkl", "rb"))
+    if os.path.exists(MANIFEST_PATH):
+        manifest = json.load(open(MANIFEST_PATH))
+        print(f"   Manifest: {manifest['dtype']} · {manifest['n_features']} features · {manifest['created']}")
+    print(f"✅ {X_train.shape[0]:,} train | {X_test.shape[0]:,} test | {len(le.classes_)} classes")
+
+    benign = list(le.classes_).index('BENIGN')
+    if args.gate_only:
+        train_gate(X_train, y_train, X_test, y_test, benign, args.gate_recall)
+        print("   Optional: python3 src/model_bundle.py     (rebuild the bundle with the new gate)")
+        return
+
+    print("\n🚀 Training XGBoost on GPU...")
+    print("   (Same code runs on AMD ROCm unchanged — PyTorch-portable)")
+    t0 = time.time()
+
+    model = make_model()
+    if args.external_memory:
+        fit_external_memory(model, X_train, y_train, X_test, y_test, len(le.classes_))
+    else:
+        model.fit(
+            X_train, y_train,
+            eval_set=[(X_test, y_test)],
+            verbose=25
+        )
+
     elapsed = round(time.time() - t0, 1)
-    y_pred  = model.predict(X_test)
+    y_pred  = predict_in_batches(model, X_test)
     acc     = accuracy_score(y_test, y_pred) * 100
 
     print(f"\n⏱️  Training time : {elapsed}s")
@@ -44,7 +162,12 @@ def main():
 
     pickle.dump(model, open("models/classifier.pkl", "wb"))
     print("✅ Saved: models/classifier.pkl")
+    if args.gate:
+        train_gate(X_train, y_train, X_test, y_test, benign, args.gate_recall)
     print("🚀 Run next: streamlit run app.py")
+    print("   Optional: python3 src/export_raw_model.py  (skip scaling at inference)")
+    print("   Optional: python3 src/model_bundle.py     (single-file bundle, sub-second startup)")
+    print("   Optional: python3 src/model_registry.py publish  (hot-swap into a running API)")
 
 if __name__ == "__main__":
     main()